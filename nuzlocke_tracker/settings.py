@@ -1,5 +1,5 @@
 from pathlib import Path
-from decouple import config
+from decouple import Choices, config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -61,6 +61,31 @@ DATABASES = {
 }
 
 
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+}
+# Version keys for cached route rows and in-memory indexes must be visible to
+# every worker and management command, so the default cache is shared.
+CACHE_BACKEND = config('CACHE_BACKEND', default='file', cast=Choices(list(CACHE_BACKENDS)))
+CACHE_LOCATIONS = {
+    "locmem": "nuzlocke-tracker",
+    "file": str(BASE_DIR / ".cache"),
+    "db": "tracker_cache",
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": config('CACHE_LOCATION', default=CACHE_LOCATIONS[CACHE_BACKEND]),
+        "OPTIONS": {
+            "MAX_ENTRIES": config('CACHE_MAX_ENTRIES', default=5000, cast=int),
+        },
+    }
+}
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -87,6 +112,21 @@ USE_TZ = True
 
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='127.0.0.1,localhost').split(',')
 
+WARM_CACHES_ON_STARTUP = config('WARM_CACHES_ON_STARTUP', default=False, cast=bool)
+
+POKEAPI_BASE_URL = config('POKEAPI_BASE_URL', default='https://pokeapi.co/api/v2/')
+POKEAPI_CACHE_DIR = config('POKEAPI_CACHE_DIR', default=str(BASE_DIR / 'pokeapi_cache'))
+
 STATIC_URL = "static/"
+STATIC_ROOT = config('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
+
+# collectstatic stores every file under a content hash, so the web server can
+# cache /static/ for a year. Sprites written later need another collectstatic.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+    },
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
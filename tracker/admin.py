@@ -1,8 +1,20 @@
 from django.contrib import admin
-from .models import Player, Route, PokemonSpecies, Encounter, PlayerType
+from .models import (
+    Player,
+    Route,
+    PokemonSpecies,
+    Encounter,
+    RouteEncounter,
+    PlayerType,
+    PokemonType,
+    TypeChart,
+)
 
 admin.site.register(Player)
 admin.site.register(Route)
 admin.site.register(PokemonSpecies)
 admin.site.register(Encounter)
+admin.site.register(RouteEncounter)
 admin.site.register(PlayerType)
+admin.site.register(PokemonType)
+admin.site.register(TypeChart)
@@ -1,6 +1,31 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+MANAGEMENT_SCRIPTS = {"manage.py", "django-admin", "django-admin.py", "__main__.py"}
+
+
+def is_server_process():
+    # ASGI/WSGI servers import the project directly; manage.py runs ready()
+    # for every command, but only runserver's reloader child serves requests.
+    if os.path.basename(sys.argv[0]) not in MANAGEMENT_SCRIPTS:
+        return True
+    if sys.argv[1:2] != ["runserver"]:
+        return False
+    return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
 
 
 class TrackerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tracker"
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+
+        # Warm in a daemon thread so startup does not wait on the database.
+        if settings.WARM_CACHES_ON_STARTUP and is_server_process():
+            from .warmup import warm_caches_in_background
+
+            warm_caches_in_background()
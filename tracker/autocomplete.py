@@ -0,0 +1,170 @@
+import itertools
+import threading
+import unicodedata
+import uuid
+
+from django.core.cache import cache
+
+from .models import PokemonSpecies, RouteEncounter
+
+INDEX_VERSION_KEY = "pokemon_name_index_version"
+ROUTES_VERSION_KEY = "route_encounter_table_version"
+MATCHES = ""
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+_routes = None
+_routes_version = None
+_routes_lock = threading.Lock()
+
+
+def normalize(text):
+    text = text.lower().replace("ß", "ss")
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+
+
+def transliterate(text):
+    text = text.lower()
+    for umlaut, replacement in (("ä", "ae"), ("ö", "oe"), ("ü", "ue")):
+        text = text.replace(umlaut, replacement)
+    return normalize(text)
+
+
+class NameIndex:
+    def __init__(self, species, masks=None, families=None):
+        # species: list of (id, name), sorted by name; masks/families: matching
+        # type masks and evolution family ids.
+        self.species = species
+        self.masks = masks or [0] * len(species)
+        self.families = families or [None] * len(species)
+        self.positions = {
+            species_id: position for position, (species_id, _) in enumerate(species)
+        }
+        self.keys = []
+        self.root = {}
+        for position, (_, name) in enumerate(species):
+            keys = {normalize(name), transliterate(name)}
+            self.keys.append(keys)
+            for key in keys:
+                node = self.root
+                for char in key:
+                    node = node.setdefault(char, {})
+                    matches = node.setdefault(MATCHES, [])
+                    if not matches or matches[-1] != position:
+                        matches.append(position)
+
+    def search(
+        self,
+        term,
+        limit=10,
+        allowed_mask=0,
+        exclude_families=frozenset(),
+        preferred=frozenset(),
+    ):
+        # preferred: species ids listed first when they match, e.g. a route's table.
+        query = normalize(term)
+        if not query:
+            return []
+
+        def allowed(position):
+            if allowed_mask and not self.masks[position] & allowed_mask:
+                return False
+            return self.families[position] not in exclude_families
+
+        node = self.root
+        for char in query:
+            node = node.get(char)
+            if node is None:
+                break
+        prefix_hits = node.get(MATCHES, []) if node else []
+
+        results = sorted(
+            position
+            for position in map(self.positions.get, preferred)
+            if position is not None
+            and allowed(position)
+            and any(query in key for key in self.keys[position])
+        )[:limit]
+        seen = set(results)
+        results += itertools.islice(
+            (
+                position
+                for position in prefix_hits
+                if position not in seen and allowed(position)
+            ),
+            limit - len(results),
+        )
+        if len(results) < limit:
+            prefix_set = set(prefix_hits) | seen
+            for position, keys in enumerate(self.keys):
+                if position in prefix_set or not allowed(position):
+                    continue
+                if any(query in key for key in keys):
+                    results.append(position)
+                    if len(results) == limit:
+                        break
+
+        return [self.species[position] for position in results]
+
+
+def get_index():
+    global _index, _index_version
+
+    version = cache.get(INDEX_VERSION_KEY)
+    if _index is not None and _index.species and version == _index_version:
+        return _index
+
+    with _index_lock:
+        if _index is None or not _index.species or version != _index_version:
+            rows = list(
+                PokemonSpecies.objects.order_by("name").values_list(
+                    "id", "name", "type_mask", "evolution_family_id"
+                )
+            )
+            _index = NameIndex(
+                [(species_id, name) for species_id, name, _, _ in rows],
+                [mask for _, _, mask, _ in rows],
+                [family_id for _, _, _, family_id in rows],
+            )
+            _index_version = version
+    return _index
+
+
+def invalidate():
+    cache.set(INDEX_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_route_species():
+    global _routes, _routes_version
+
+    version = cache.get(ROUTES_VERSION_KEY)
+    if _routes is not None and version == _routes_version:
+        return _routes
+
+    with _routes_lock:
+        if _routes is None or version != _routes_version:
+            routes = {}
+            for route_id, species_id in RouteEncounter.objects.order_by().values_list(
+                "route_id", "species_id"
+            ):
+                routes.setdefault(route_id, set()).add(species_id)
+            _routes = {route_id: frozenset(ids) for route_id, ids in routes.items()}
+            _routes_version = version
+    return _routes
+
+
+def invalidate_routes():
+    cache.set(ROUTES_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def search_species(
+    term, limit=10, allowed_mask=0, exclude_families=frozenset(), route_id=None
+):
+    preferred = get_route_species().get(route_id, frozenset())
+    return get_index().search(term, limit, allowed_mask, exclude_families, preferred)
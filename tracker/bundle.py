@@ -0,0 +1,168 @@
+import base64
+import gzip
+import json
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import autocomplete, legality
+from .grid import bump_grid
+from .models import PokemonSpecies, Route, RouteEncounter
+from .typechart import dump_types, store_types, type_mask
+
+BUNDLE_FORMAT = "nuzlocke-tracker-bundle"
+BUNDLE_VERSION = 1
+SPRITE_DIR = Path(__file__).resolve().parent / "static" / "tracker" / "sprites"
+SPECIES_FIELDS = [
+    "pokedex_id",
+    "name",
+    "type1",
+    "type2",
+    "sprite_url",
+    "evolution_family_id",
+]
+
+
+class BundleError(Exception):
+    pass
+
+
+def sprite_path(pokedex_id, sprite_dir=SPRITE_DIR):
+    return Path(sprite_dir) / f"{pokedex_id}.png"
+
+
+def build_bundle(sprites=None):
+    # sprites: optional {pokedex_id: png bytes}
+    species = list(PokemonSpecies.objects.order_by("pokedex_id").values(*SPECIES_FIELDS))
+    if sprites:
+        for row in species:
+            sprite = sprites.get(row["pokedex_id"])
+            if sprite:
+                row["sprite"] = base64.b64encode(sprite).decode("ascii")
+
+    route_encounters = [
+        {"route": route, "pokedex_id": pokedex_id, "method": method, "rate": rate}
+        for route, pokedex_id, method, rate in RouteEncounter.objects.order_by(
+            "route__order", "route__name", "-rate", "species__pokedex_id"
+        ).values_list("route__name", "species__pokedex_id", "method", "rate")
+    ]
+
+    return {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created": timezone.now().isoformat(),
+        "types": dump_types(),
+        "species": species,
+        "route_encounters": route_encounters,
+    }
+
+
+def write_bundle(bundle, path):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(bundle, f, ensure_ascii=False)
+
+
+def read_bundle(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    bundle = json.loads(data.decode("utf-8"))
+
+    if not isinstance(bundle, dict) or bundle.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"{path} is not a Nuzlocke tracker data bundle.")
+    if bundle.get("version") != BUNDLE_VERSION:
+        raise BundleError(f"Unsupported bundle version {bundle.get('version')}.")
+    return bundle
+
+
+def store_species(species_data, batch_size=200):
+    PokemonSpecies.objects.bulk_create(
+        [
+            PokemonSpecies(**data, type_mask=type_mask(data["type1"], data.get("type2")))
+            for data in species_data
+        ],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["pokedex_id"],
+        update_fields=[
+            "name",
+            "type1",
+            "type2",
+            "sprite_url",
+            "type_mask",
+            "evolution_family_id",
+        ],
+    )
+    # Readers in other processes must not rebuild before the rows are visible.
+    transaction.on_commit(autocomplete.invalidate)
+    transaction.on_commit(legality.invalidate_families)
+    # Cached route rows show species names.
+    transaction.on_commit(bump_grid)
+
+
+def store_route_encounters(rows, batch_size=500):
+    # rows: [{"route", "pokedex_id", "method", "rate"}]; replaces the tables of
+    # the listed routes. Routes and species that do not exist here are skipped.
+    route_ids = dict(
+        Route.objects.filter(name__in={row["route"] for row in rows}).values_list(
+            "name", "id"
+        )
+    )
+    species_ids = dict(
+        PokemonSpecies.objects.filter(
+            pokedex_id__in={row["pokedex_id"] for row in rows}
+        ).values_list("pokedex_id", "id")
+    )
+
+    rates = {}
+    for row in rows:
+        route_id = route_ids.get(row["route"])
+        species_id = species_ids.get(row["pokedex_id"])
+        if route_id is None or species_id is None:
+            continue
+        key = (route_id, species_id, row["method"])
+        rates[key] = max(rates.get(key, 0), min(int(row["rate"]), 100))
+
+    with transaction.atomic():
+        RouteEncounter.objects.filter(route_id__in=route_ids.values()).delete()
+        RouteEncounter.objects.bulk_create(
+            [
+                RouteEncounter(
+                    route_id=route_id, species_id=species_id, method=method, rate=rate
+                )
+                for (route_id, species_id, method), rate in rates.items()
+            ],
+            batch_size=batch_size,
+        )
+        transaction.on_commit(autocomplete.invalidate_routes)
+    return len(rates)
+
+
+def load_bundle(bundle, sprite_dir=SPRITE_DIR, batch_size=500):
+    species_data = []
+    sprite_count = 0
+    for row in bundle["species"]:
+        data = {field: row.get(field) for field in SPECIES_FIELDS}
+        if row.get("sprite") and sprite_dir:
+            path = sprite_path(row["pokedex_id"], sprite_dir)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(base64.b64decode(row["sprite"]))
+            sprite_count += 1
+        species_data.append(data)
+
+    type_count, matchup_count = store_types(bundle["types"])
+    store_species(species_data, batch_size)
+    # Bundles written before route tables existed have no route_encounters.
+    route_encounter_count = store_route_encounters(
+        bundle.get("route_encounters") or [], batch_size
+    )
+
+    return {
+        "type_count": type_count,
+        "matchup_count": matchup_count,
+        "species_count": len(species_data),
+        "sprite_count": sprite_count,
+        "route_encounter_count": route_encounter_count,
+    }
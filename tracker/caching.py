@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connections
+
+LOCK_TIMEOUT = 30
+# Callers wait at most this long for another process's value, then compute it
+# themselves.
+LOCK_WAIT = 2
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_cache():
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def lock_key(key):
+    return f"{key}:lock"
+
+
+def lock_path(cache, key):
+    # Next to the cache files, but not named *.djcache, so culling skips it.
+    return os.path.splitext(cache._key_to_file(lock_key(key)))[0] + ".lock"
+
+
+def acquire(key):
+    cache = get_cache()
+    if not isinstance(cache, FileBasedCache):
+        # Atomic on the locmem, database, Redis and Memcached backends.
+        return cache.add(lock_key(key), 1, LOCK_TIMEOUT)
+
+    # FileBasedCache.add checks and writes separately, so two processes can both
+    # win it; O_EXCL lets exactly one of them create the lock file.
+    path = lock_path(cache, key)
+    for _ in range(2):
+        try:
+            os.makedirs(cache._dir, exist_ok=True)
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) < LOCK_TIMEOUT:
+                    return False
+                # Left behind by a process that died while computing.
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    return False
+
+
+def release(key):
+    cache = get_cache()
+    if not isinstance(cache, FileBasedCache):
+        cache.delete(lock_key(key))
+        return
+    try:
+        os.remove(lock_path(cache, key))
+    except FileNotFoundError:
+        pass
+
+
+def store(key, value, timeout, stale_timeout):
+    get_cache().set(
+        key,
+        {"value": value, "fresh_until": time.time() + timeout},
+        timeout=timeout + stale_timeout,
+    )
+
+
+def refresh(key, compute, timeout, stale_timeout):
+    try:
+        value = compute()
+        # Failures (None) are not cached, so the next request tries again.
+        if value is not None:
+            store(key, value, timeout, stale_timeout)
+        return value
+    finally:
+        release(key)
+
+
+def refresh_in_background(key, compute, timeout, stale_timeout):
+    def run():
+        try:
+            refresh(key, compute, timeout, stale_timeout)
+        except Exception as e:
+            print(f"Error refreshing cache key {key}: {e}")
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, name=f"refresh-{key}", daemon=True).start()
+
+
+def get_or_set(key, compute, timeout, stale_timeout=0):
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is not None:
+        # Stale entries are served while a single caller recomputes them.
+        if entry["fresh_until"] <= time.time() and acquire(key):
+            refresh_in_background(key, compute, timeout, stale_timeout)
+        return entry["value"]
+
+    # On a miss only the caller holding the lock computes; the others wait a
+    # little for its value and then compute their own.
+    deadline = time.monotonic() + LOCK_WAIT
+    while not acquire(key):
+        if time.monotonic() >= deadline:
+            return compute()
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"]
+
+    entry = cache.get(key)
+    if entry is not None:
+        release(key)
+        return entry["value"]
+    return refresh(key, compute, timeout, stale_timeout)
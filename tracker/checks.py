@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    # The autocomplete index, type registry, legality masks and route rows are
+    # invalidated through version keys in the default cache. Management
+    # commands and other workers only reach the server through a shared cache.
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is not shared between processes.",
+            hint=(
+                "Changes made by management commands or other workers will not "
+                "invalidate this server's caches. Set CACHE_BACKEND=file or db."
+            ),
+            obj=backend,
+            id="tracker.W001",
+        )
+    ]
@@ -0,0 +1,78 @@
+import random
+
+from django.db import transaction
+
+from . import events, legality
+from .models import Player, PlayerType
+from .type_registry import get_type_registry
+
+
+def plan_distribution(type_counts, free_types, quotas=None, seed=None):
+    # type_counts: {player_id: types already assigned}; quotas: {player_id: max new types}.
+    # Each type goes to the player with the fewest types so far, ties broken at random.
+    rng = random.Random(seed)
+    types = sorted(free_types)
+    rng.shuffle(types)
+
+    counts = dict(type_counts)
+    received = {player_id: 0 for player_id in counts}
+    tie_breakers = {player_id: rng.random() for player_id in counts}
+    quotas = quotas or {}
+
+    plan = []
+    for type_name in types:
+        candidates = [
+            player_id
+            for player_id in counts
+            if player_id not in quotas or received[player_id] < quotas[player_id]
+        ]
+        if not candidates:
+            break
+        player_id = min(
+            candidates, key=lambda pid: (counts[pid], received[pid], tie_breakers[pid])
+        )
+        plan.append((player_id, type_name))
+        counts[player_id] += 1
+        received[player_id] += 1
+    return plan
+
+
+def distribute_types(player_ids=None, quotas=None, seed=None):
+    with transaction.atomic():
+        players = Player.objects.order_by("name")
+        if player_ids is not None:
+            players = players.filter(pk__in=player_ids)
+        type_counts = {player_id: 0 for player_id in players.values_list("id", flat=True)}
+
+        assigned = set()
+        next_order = {}
+        for player_id, type_name, order in PlayerType.objects.values_list(
+            "player_id", "type_name", "order"
+        ):
+            assigned.add(type_name)
+            if player_id in type_counts:
+                type_counts[player_id] += 1
+                next_order[player_id] = max(next_order.get(player_id, 0), order + 1)
+
+        free_types = set(get_type_registry().en_to_de.values()) - assigned
+        plan = plan_distribution(type_counts, free_types, quotas, seed)
+
+        assignments = []
+        for player_id, type_name in plan:
+            order = next_order.get(player_id, 0)
+            next_order[player_id] = order + 1
+            assignments.append(
+                PlayerType(player_id=player_id, type_name=type_name, order=order)
+            )
+        # The unique type_name constraint rolls this back if a type was taken meanwhile.
+        PlayerType.objects.bulk_create(assignments)
+
+        # bulk_create sends no signals, so publish what signals.py would.
+        def on_commit():
+            legality.invalidate()
+            for player_id in {assignment.player_id for assignment in assignments}:
+                events.publish_player_types(player_id)
+
+        transaction.on_commit(on_commit)
+
+    return assignments
@@ -0,0 +1,207 @@
+from django.db import transaction
+
+from . import events, legality
+from .legality import CAUGHT_STATUSES
+from .grid import bump_route_rows
+from .importer import VALID_STATUSES, load_species_by_name
+from .models import Encounter, Player, Route
+
+MAX_BATCH_SIZE = 500
+EMPTY_STATUSES = ["-", "verkackt"]
+NICKNAME_MAX_LENGTH = Encounter._meta.get_field("nickname").max_length
+
+
+def parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def illegal_catch_message(species_name):
+    return f"Pokémon '{species_name}' passt zu keinem Typ des Spielers."
+
+
+def clean_update(item, player_ids, route_ids, species):
+    errors = {}
+    player_id = parse_id(item.get("player"))
+    route_id = parse_id(item.get("route"))
+    if player_id not in player_ids:
+        errors["player"] = ["Spieler nicht gefunden."]
+    if route_id not in route_ids:
+        errors["route"] = ["Route nicht gefunden."]
+
+    status = item.get("status") or "-"
+    if not isinstance(status, str) or status not in VALID_STATUSES:
+        errors["status"] = [f"Ungültiger Status '{status}'."]
+
+    nickname = item.get("nickname") or ""
+    if not isinstance(nickname, str):
+        errors["nickname"] = ["Ungültiger Spitzname."]
+        nickname = ""
+    nickname = nickname.strip()
+    if len(nickname) > NICKNAME_MAX_LENGTH:
+        errors["nickname"] = [
+            f"Der Spitzname darf höchstens {NICKNAME_MAX_LENGTH} Zeichen lang sein."
+        ]
+
+    pokemon_name = item.get("pokemon_name") or ""
+    if not isinstance(pokemon_name, str):
+        errors["pokemon_name"] = ["Ungültiger Pokémon-Name."]
+        pokemon_name = ""
+    pokemon_name = pokemon_name.strip()
+    species_id, species_name, species_mask, family_id = species.get(
+        pokemon_name.casefold(), (None, "", 0, None)
+    )
+    if pokemon_name and species_id is None and status not in EMPTY_STATUSES:
+        errors["pokemon_name"] = [
+            f"Pokémon '{pokemon_name}' nicht in der Datenbank gefunden."
+        ]
+
+    if species_id and nickname and status == "-":
+        status = "gefangen"
+    if (
+        species_id
+        and status in CAUGHT_STATUSES
+        and not legality.is_allowed(species_mask, legality.allowed_mask(player_id))
+    ):
+        errors["pokemon_name"] = [illegal_catch_message(species_name)]
+
+    if errors:
+        return None, errors
+
+    if status in EMPTY_STATUSES:
+        species_id, species_name, nickname, family_id = None, "", "", None
+
+    return {
+        "player_id": player_id,
+        "route_id": route_id,
+        "pokemon_species_id": species_id,
+        "pokemon_name": species_name,
+        "nickname": nickname,
+        "status": status,
+        "evolution_family_id": family_id,
+    }, None
+
+
+def save_encounters(updates):
+    items = [item if isinstance(item, dict) else {} for item in updates]
+
+    player_ids = set(
+        Player.objects.filter(
+            pk__in={parse_id(item.get("player")) for item in items} - {None}
+        ).values_list("id", flat=True)
+    )
+    route_ids = set(
+        Route.objects.filter(
+            pk__in={parse_id(item.get("route")) for item in items} - {None}
+        ).values_list("id", flat=True)
+    )
+    species = load_species_by_name(
+        {
+            item["pokemon_name"].strip()
+            for item in items
+            if isinstance(item.get("pokemon_name"), str) and item["pokemon_name"].strip()
+        }
+    )
+
+    results = []
+    cells = {}
+    families = {}
+    for item in items:
+        values, errors = clean_update(item, player_ids, route_ids, species)
+        if errors:
+            results.append(
+                {
+                    "player": item.get("player"),
+                    "route": item.get("route"),
+                    "status": "error",
+                    "errors": errors,
+                }
+            )
+            continue
+
+        # A later update for the same cell in one batch wins.
+        key = (values["player_id"], values["route_id"])
+        families[key] = values.pop("evolution_family_id")
+        cells[key] = values
+        results.append(
+            {
+                "player": values["player_id"],
+                "route": values["route_id"],
+                "status": "success",
+                "pokemon_species_id": values["pokemon_species_id"] or "",
+                "status_value": values["status"],
+            }
+        )
+
+    # Dupes are checked against the saved catches and the other cells of this
+    # batch; cells in the batch replace what is saved for them.
+    batch_catches = {}
+    for key, values in cells.items():
+        if values["status"] in CAUGHT_STATUSES and families[key] is not None:
+            player_id, route_id = key
+            batch_catches.setdefault((player_id, families[key]), set()).add(route_id)
+    for result in results:
+        if result["status"] != "success":
+            continue
+        player_id, route_id = result["player"], result["route"]
+        family_id = families[(player_id, route_id)]
+        caught_on = {
+            other
+            for other in legality.family_routes(player_id, family_id)
+            if (player_id, other) not in cells
+        } | batch_catches.get((player_id, family_id), set())
+        result["dupe"] = family_id is not None and bool(caught_on - {route_id})
+
+    if not cells:
+        return results
+
+    with transaction.atomic():
+        existing = {
+            (encounter.player_id, encounter.route_id): encounter
+            for encounter in Encounter.objects.select_for_update()
+            .filter(
+                player_id__in={player_id for player_id, _ in cells},
+                route_id__in={route_id for _, route_id in cells},
+            )
+            .order_by()
+        }
+        to_create = []
+        to_update = []
+        for key, values in cells.items():
+            fields = {
+                "pokemon_species_id": values["pokemon_species_id"],
+                "nickname": values["nickname"],
+                "status": values["status"],
+            }
+            encounter = existing.get(key)
+            if encounter is None:
+                to_create.append(Encounter(player_id=key[0], route_id=key[1], **fields))
+            else:
+                for field, value in fields.items():
+                    setattr(encounter, field, value)
+                to_update.append(encounter)
+
+        # Upsert, so a cell created concurrently by another request is updated.
+        Encounter.objects.bulk_create(
+            to_create,
+            update_conflicts=True,
+            unique_fields=["player", "route"],
+            update_fields=["pokemon_species", "nickname", "status"],
+        )
+        Encounter.objects.bulk_update(
+            to_update, ["pokemon_species", "nickname", "status"], batch_size=500
+        )
+
+        # bulk_create/bulk_update send no signals, so do what signals.py would.
+        def on_commit():
+            bump_route_rows({route_id for _, route_id in cells})
+            legality.invalidate_families()
+            if events.has_subscribers():
+                for values in cells.values():
+                    events.publish(events.encounter_event(**values))
+
+        transaction.on_commit(on_commit)
+
+    return results
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+
+from .models import Encounter, PlayerType
+
+KEEPALIVE_INTERVAL = 15
+QUEUE_SIZE = 200
+
+_subscribers = set()
+_subscribers_lock = threading.Lock()
+
+
+class Subscription:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def put(self, data):
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # The client fell too far behind to patch cells, let it reload.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(json.dumps({"type": "reload"}))
+
+
+def has_subscribers():
+    return bool(_subscribers)
+
+
+def publish(event):
+    data = json.dumps(event)
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for subscription in subscribers:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.put, data)
+        except RuntimeError:
+            with _subscribers_lock:
+                _subscribers.discard(subscription)
+
+
+async def stream():
+    subscription = Subscription()
+    with _subscribers_lock:
+        _subscribers.add(subscription)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                data = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=KEEPALIVE_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {data}\n\n"
+    finally:
+        with _subscribers_lock:
+            _subscribers.discard(subscription)
+
+
+def encounter_event(player_id, route_id, pokemon_species_id, pokemon_name, nickname, status):
+    return {
+        "type": "encounter",
+        "player_id": player_id,
+        "route_id": route_id,
+        "pokemon_species_id": pokemon_species_id,
+        "pokemon_name": pokemon_name or "",
+        "nickname": nickname or "",
+        "status": status,
+    }
+
+
+def publish_encounter(encounter, deleted=False):
+    if not has_subscribers():
+        return
+    if deleted:
+        publish(encounter_event(encounter.player_id, encounter.route_id, None, "", "", "-"))
+        return
+
+    species = encounter.pokemon_species if encounter.pokemon_species_id else None
+    publish(
+        encounter_event(
+            encounter.player_id,
+            encounter.route_id,
+            encounter.pokemon_species_id,
+            species.name if species else "",
+            encounter.nickname,
+            encounter.status,
+        )
+    )
+
+
+def publish_route(route_id):
+    if not has_subscribers():
+        return
+    rows = Encounter.objects.filter(route_id=route_id).order_by().values_list(
+        "player_id",
+        "route_id",
+        "pokemon_species_id",
+        "pokemon_species__name",
+        "nickname",
+        "status",
+    )
+    for row in rows:
+        publish(encounter_event(*row))
+
+
+def publish_player_types(player_id):
+    if not has_subscribers():
+        return
+    type_names = PlayerType.objects.filter(player_id=player_id).order_by(
+        "order", "type_name"
+    ).values_list("type_name", flat=True)
+    publish(
+        {"type": "player_types", "player_id": player_id, "types": list(type_names)}
+    )
+
+
+def publish_route_added(route_id, html, before_route_id):
+    publish(
+        {
+            "type": "route_added",
+            "route_id": route_id,
+            "html": html,
+            "before_route_id": before_route_id,
+        }
+    )
+
+
+def publish_route_deleted(route_id):
+    publish({"type": "route_deleted", "route_id": route_id})
+
+
+def publish_reload():
+    publish({"type": "reload"})
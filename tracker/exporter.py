@@ -0,0 +1,78 @@
+import json
+import zlib
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from .models import Encounter, PlayerType
+
+CHUNK_SIZE = 500
+
+
+def encounter_rows():
+    rows = (
+        Encounter.objects.order_by("route__order", "route__name", "player__name")
+        .values("player__name", "route__name", "status", "nickname", "pokemon_species__name")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for row in rows:
+        yield {
+            "player_name": row["player__name"],
+            "route_name": row["route__name"],
+            "status": row["status"],
+            "nickname": row["nickname"],
+            "pokemon_name": row["pokemon_species__name"],
+        }
+
+
+def player_type_rows():
+    rows = (
+        PlayerType.objects.order_by("player__name", "order")
+        .values("player__name", "type_name", "order")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for row in rows:
+        yield {
+            "player_name": row["player__name"],
+            "type_name": row["type_name"],
+            "order": row["order"],
+        }
+
+
+def stream_json():
+    yield '{"encounters": ['
+    for index, row in enumerate(encounter_rows()):
+        yield ("," if index else "") + json.dumps(row, ensure_ascii=False)
+    yield '], "player_types": ['
+    for index, row in enumerate(player_type_rows()):
+        yield ("," if index else "") + json.dumps(row, ensure_ascii=False)
+    yield "]}\n"
+
+
+def stream_ndjson():
+    for row in encounter_rows():
+        yield json.dumps({"kind": "encounter", **row}, ensure_ascii=False) + "\n"
+    for row in player_type_rows():
+        yield json.dumps({"kind": "player_type", **row}, ensure_ascii=False) + "\n"
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def async_chunks(chunks, batch_size=CHUNK_SIZE):
+    # Under ASGI a sync generator would be drained into a list before the
+    # first byte is sent; batches are pulled on Django's sync thread instead,
+    # so the database cursor stays on one connection.
+    next_batch = sync_to_async(lambda: list(islice(chunks, batch_size)))
+    while True:
+        batch = await next_batch()
+        if not batch:
+            break
+        for chunk in batch:
+            yield chunk
@@ -1,4 +1,7 @@
 from django import forms
+from . import legality
+from .encounters import illegal_catch_message
+from .legality import CAUGHT_STATUSES
 from .models import Encounter, Player, Route, PokemonSpecies
 
 
@@ -48,11 +51,30 @@ class EncounterForm(forms.ModelForm):
                 if status not in ["-", "verkackt"]:
                     self.add_error(
                         "pokemon_name",
-                        f"Pokémon '{pokemon_name}' nicht in der Datenbank gefunden.",
+                        forms.ValidationError(
+                            f"Pokémon '{pokemon_name}' nicht in der Datenbank gefunden.",
+                            code="not_found",
+                        ),
                     )
                 else:
                     cleaned_data["pokemon_species"] = None
         else:
             cleaned_data["pokemon_species"] = None
 
+        species = cleaned_data.get("pokemon_species")
+        player = cleaned_data.get("player")
+        caught = status in CAUGHT_STATUSES or (
+            status == "-" and cleaned_data.get("nickname")
+        )
+        if (
+            species
+            and player
+            and caught
+            and not legality.is_allowed(species.type_mask, legality.allowed_mask(player.id))
+        ):
+            self.add_error(
+                "pokemon_name",
+                forms.ValidationError(illegal_catch_message(species.name), code="illegal"),
+            )
+
         return cleaned_data
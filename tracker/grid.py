@@ -0,0 +1,154 @@
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.template.loader import render_to_string
+
+from .models import Player, Route, Encounter, PlayerType
+
+GRID_VERSION_KEY = "tracker_grid_version"
+ROUTE_ROW_VERSION_KEY = "tracker_route_row_version_{}"
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def bump_grid():
+    cache.set(GRID_VERSION_KEY, new_version(), timeout=None)
+
+
+def bump_route_rows(route_ids):
+    cache.set_many(
+        {ROUTE_ROW_VERSION_KEY.format(route_id): new_version() for route_id in route_ids},
+        timeout=None,
+    )
+
+
+def get_route_row_versions(route_ids):
+    keys = {route_id: ROUTE_ROW_VERSION_KEY.format(route_id) for route_id in route_ids}
+    versions = cache.get_many(keys.values())
+
+    # Missing versions get a fresh token instead of a default, so an evicted
+    # counter can never point back at an older cached fragment.
+    missing = {key: new_version() for key in keys.values() if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+
+    return {route_id: versions[key] for route_id, key in keys.items()}
+
+
+def get_grid_version():
+    version = cache.get(GRID_VERSION_KEY)
+    if version is None:
+        version = new_version()
+        cache.set(GRID_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def empty_cell(player_id):
+    return {
+        "player_id": player_id,
+        "pokemon_species_id": None,
+        "pokemon_name": "",
+        "nickname": "",
+        "status": "-",
+    }
+
+
+def fill_cell(cell, species_id, species_name, nickname, status):
+    cell["pokemon_species_id"] = species_id
+    cell["pokemon_name"] = species_name or ""
+    cell["nickname"] = nickname or ""
+    cell["status"] = status
+
+
+def build_tracker_grid(type_colors_de):
+    players = list(Player.objects.order_by("id").values("id", "name"))
+    routes = list(Route.objects.order_by("order", "name").values("id", "name"))
+
+    player_index = {}
+    for index, player in enumerate(players):
+        player["types"] = []
+        player_index[player["id"]] = index
+
+    for player_id, type_name in PlayerType.objects.order_by("order").values_list(
+        "player_id", "type_name"
+    ):
+        if player_id in player_index:
+            players[player_index[player_id]]["types"].append(
+                {"name": type_name, "color": type_colors_de.get(type_name, "#68A090")}
+            )
+
+    row_versions = get_route_row_versions([route["id"] for route in routes])
+
+    rows = []
+    row_index = {}
+    for route in routes:
+        row_index[route["id"]] = len(rows)
+        rows.append(
+            {
+                "route": route,
+                "version": row_versions[route["id"]],
+                "cells": [empty_cell(player["id"]) for player in players],
+            }
+        )
+
+    encounters = Encounter.objects.order_by().values_list(
+        "route_id",
+        "player_id",
+        "pokemon_species_id",
+        "pokemon_species__name",
+        "nickname",
+        "status",
+    )
+    for route_id, player_id, species_id, species_name, nickname, status in encounters:
+        if route_id not in row_index or player_id not in player_index:
+            continue
+        fill_cell(
+            rows[row_index[route_id]]["cells"][player_index[player_id]],
+            species_id,
+            species_name,
+            nickname,
+            status,
+        )
+
+    return {"players": players, "rows": rows, "version": get_grid_version()}
+
+
+def render_route_row(route_id):
+    # One rendered row for clients that add it in place, plus the id of the
+    # route it goes before (None for the end of the table).
+    route = Route.objects.filter(pk=route_id).values("id", "name", "order").first()
+    if route is None:
+        return None, None
+
+    cells = {
+        player_id: empty_cell(player_id)
+        for player_id in Player.objects.order_by("id").values_list("id", flat=True)
+    }
+    for player_id, species_id, species_name, nickname, status in Encounter.objects.filter(
+        route_id=route_id
+    ).order_by().values_list(
+        "player_id", "pokemon_species_id", "pokemon_species__name", "nickname", "status"
+    ):
+        if player_id in cells:
+            fill_cell(cells[player_id], species_id, species_name, nickname, status)
+
+    html = render_to_string(
+        "tracker/_route_row.html",
+        {
+            "row": {"route": route, "cells": list(cells.values())},
+            "status_choices": Encounter.STATUS_CHOICES,
+        },
+    )
+    before_route_id = (
+        Route.objects.filter(
+            Q(order__gt=route["order"]) | Q(order=route["order"], name__gt=route["name"])
+        )
+        .order_by("order", "name")
+        .values_list("id", flat=True)
+        .first()
+    )
+    return html, before_route_id
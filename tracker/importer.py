@@ -0,0 +1,238 @@
+import gzip
+import json
+
+from django.db.models import Q
+
+from .models import Player, Route, Encounter, PokemonSpecies, PlayerType
+
+VALID_STATUSES = {value for value, _ in Encounter.STATUS_CHOICES}
+PLAYER_NAME_MAX_LENGTH = Player._meta.get_field("name").max_length
+NICKNAME_MAX_LENGTH = Encounter._meta.get_field("nickname").max_length
+TYPE_NAME_MAX_LENGTH = PlayerType._meta.get_field("type_name").max_length
+
+
+def is_text(value, max_length=None):
+    return (
+        isinstance(value, str)
+        and bool(value)
+        and (max_length is None or len(value) <= max_length)
+    )
+
+
+def is_player_name(value):
+    return is_text(value, PLAYER_NAME_MAX_LENGTH)
+
+
+def normalize_status(status):
+    if not status or status == "verpasst":
+        return "-"
+    return status
+
+
+def parse_import_file(data):
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    text = data.decode("utf-8-sig")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # NDJSON: one record per line.
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def split_import_data(import_data):
+    if isinstance(import_data, dict) and (
+        "encounters" in import_data or "player_types" in import_data
+    ):
+        return import_data.get("encounters", []), import_data.get("player_types", [])
+
+    records = import_data if isinstance(import_data, list) else [import_data]
+    encounters_data = []
+    player_types_data = []
+    for record in records:
+        if isinstance(record, dict) and (
+            record.get("kind") == "player_type"
+            or ("kind" not in record and "type_name" in record)
+        ):
+            player_types_data.append(record)
+        else:
+            encounters_data.append(record)
+    return encounters_data, player_types_data
+
+
+def load_players(names):
+    players = dict(Player.objects.filter(name__in=names).values_list("name", "id"))
+    missing = [name for name in names if name not in players]
+    if missing:
+        Player.objects.bulk_create(
+            [Player(name=name) for name in missing], ignore_conflicts=True
+        )
+        players.update(
+            Player.objects.filter(name__in=missing).values_list("name", "id")
+        )
+    return players
+
+
+def load_species_by_name(names):
+    if not names:
+        return {}
+    # iexact uses the Upper("name") index; casefold keys the result in Python.
+    query = Q()
+    for name in names:
+        query |= Q(name__iexact=name)
+    return {
+        name.casefold(): (species_id, name, mask, family_id)
+        for species_id, name, mask, family_id in PokemonSpecies.objects.filter(
+            query
+        ).values_list("id", "name", "type_mask", "evolution_family_id")
+    }
+
+
+def load_species(names):
+    return {
+        key: species_id
+        for key, (species_id, *_) in load_species_by_name(names).items()
+    }
+
+
+def import_run(encounters_data, player_types_data):
+    errors = []
+
+    # Values of the wrong type are left out here and reported per row below.
+    player_names = {
+        item.get("player_name")
+        for item in list(encounters_data) + list(player_types_data)
+        if isinstance(item, dict) and is_player_name(item.get("player_name"))
+    }
+    route_names = {
+        item.get("route_name")
+        for item in encounters_data
+        if isinstance(item, dict) and is_text(item.get("route_name"))
+    }
+    species_names = {
+        item["pokemon_name"]
+        for item in encounters_data
+        if isinstance(item, dict) and is_text(item.get("pokemon_name"))
+    }
+
+    players = load_players(player_names)
+    routes = dict(Route.objects.filter(name__in=route_names).values_list("name", "id"))
+    species = load_species(species_names)
+
+    encounter_count = 0
+    encounter_values = {}
+    for row, item in enumerate(encounters_data):
+        if not isinstance(item, dict):
+            errors.append({"type": "encounter", "row": row, "error": "Ungültiger Eintrag."})
+            continue
+
+        player_name = item.get("player_name")
+        route_name = item.get("route_name")
+        if not player_name or not route_name:
+            errors.append(
+                {"type": "encounter", "row": row, "error": "Spieler oder Route fehlt."}
+            )
+            continue
+        if not is_player_name(player_name):
+            errors.append(
+                {"type": "encounter", "row": row, "error": "Ungültiger Spielername."}
+            )
+            continue
+        if not isinstance(route_name, str) or route_name not in routes:
+            errors.append(
+                {
+                    "type": "encounter",
+                    "row": row,
+                    "error": f"Route '{route_name}' nicht gefunden.",
+                }
+            )
+            continue
+
+        status = normalize_status(item.get("status"))
+        if not isinstance(status, str) or status not in VALID_STATUSES:
+            errors.append(
+                {"type": "encounter", "row": row, "error": f"Ungültiger Status '{status}'."}
+            )
+            continue
+
+        nickname = item.get("nickname")
+        if nickname is not None and (
+            not isinstance(nickname, str) or len(nickname) > NICKNAME_MAX_LENGTH
+        ):
+            errors.append(
+                {"type": "encounter", "row": row, "error": "Ungültiger Spitzname."}
+            )
+            continue
+
+        pokemon_name = item.get("pokemon_name")
+        species_id = None
+        if pokemon_name:
+            if isinstance(pokemon_name, str):
+                species_id = species.get(pokemon_name.casefold())
+            if species_id is None:
+                errors.append(
+                    {
+                        "type": "encounter",
+                        "row": row,
+                        "error": f"Pokémon '{pokemon_name}' nicht gefunden.",
+                    }
+                )
+                continue
+
+        encounter_values[(players[player_name], routes[route_name])] = {
+            "pokemon_species_id": species_id,
+            "nickname": nickname,
+            "status": status,
+        }
+        encounter_count += 1
+
+    # One upsert whatever the size of the run; no batch_size, so the backend only
+    # splits it where its parameter limit forces it to.
+    Encounter.objects.bulk_create(
+        [
+            Encounter(player_id=player_id, route_id=route_id, **values)
+            for (player_id, route_id), values in encounter_values.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["player", "route"],
+        update_fields=["pokemon_species", "nickname", "status"],
+    )
+
+    type_count = 0
+    type_values = {}
+    for row, item in enumerate(player_types_data):
+        if not isinstance(item, dict) or not item.get("player_name") or not item.get(
+            "type_name"
+        ):
+            errors.append(
+                {"type": "player_type", "row": row, "error": "Spieler oder Typ fehlt."}
+            )
+            continue
+        order = item.get("order", 0)
+        if (
+            not is_player_name(item["player_name"])
+            or not is_text(item["type_name"], TYPE_NAME_MAX_LENGTH)
+            or not isinstance(order, int)
+            or isinstance(order, bool)
+        ):
+            errors.append(
+                {"type": "player_type", "row": row, "error": "Ungültiger Eintrag."}
+            )
+            continue
+        type_values[item["type_name"]] = (players[item["player_name"]], order)
+        type_count += 1
+
+    if type_values:
+        PlayerType.objects.filter(type_name__in=type_values).delete()
+        PlayerType.objects.bulk_create(
+            [
+                PlayerType(player_id=player_id, type_name=type_name, order=order)
+                for type_name, (player_id, order) in type_values.items()
+            ]
+        )
+
+    return {
+        "encounter_count": encounter_count,
+        "type_count": type_count,
+        "errors": errors,
+    }
@@ -0,0 +1,105 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from .models import Encounter, PlayerType
+from .type_registry import get_type_registry
+from .typechart import type_mask
+
+MASKS_VERSION_KEY = "player_type_masks_version"
+FAMILIES_VERSION_KEY = "player_caught_families_version"
+CAUGHT_STATUSES = ["gefangen", "tot"]
+
+_masks = None
+_masks_version = None
+_masks_lock = threading.Lock()
+
+_families = None
+_families_version = None
+_families_lock = threading.Lock()
+
+
+def load_masks(registry):
+    # {player_id: mask of the player's assigned types}; names are stored in German.
+    masks = {}
+    for player_id, type_name in PlayerType.objects.values_list("player_id", "type_name"):
+        bit = type_mask(registry.de_to_en.get(type_name))
+        masks[player_id] = masks.get(player_id, 0) | bit
+    return masks
+
+
+def get_masks():
+    global _masks, _masks_version
+
+    registry = get_type_registry()
+    version = (cache.get(MASKS_VERSION_KEY), registry.version)
+    if _masks is not None and version == _masks_version:
+        return _masks
+
+    with _masks_lock:
+        if _masks is None or version != _masks_version:
+            _masks = load_masks(registry)
+            _masks_version = version
+    return _masks
+
+
+def invalidate():
+    cache.set(MASKS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def allowed_mask(player_id):
+    # 0 means the player has no types yet and may catch anything.
+    return get_masks().get(player_id, 0)
+
+
+def is_allowed(species_mask, allowed):
+    return not allowed or bool(species_mask & allowed)
+
+
+def load_families():
+    # {player_id: {evolution_family_id: {route_id, ...}}} for every caught Pokémon.
+    families = {}
+    for player_id, route_id, family_id in Encounter.objects.filter(
+        status__in=CAUGHT_STATUSES,
+        pokemon_species__evolution_family_id__isnull=False,
+    ).values_list("player_id", "route_id", "pokemon_species__evolution_family_id"):
+        families.setdefault(player_id, {}).setdefault(family_id, set()).add(route_id)
+    return families
+
+
+def get_families():
+    global _families, _families_version
+
+    version = cache.get(FAMILIES_VERSION_KEY)
+    if _families is not None and version == _families_version:
+        return _families
+
+    with _families_lock:
+        if _families is None or version != _families_version:
+            _families = load_families()
+            _families_version = version
+    return _families
+
+
+def invalidate_families():
+    cache.set(FAMILIES_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def caught_families(player_id, route_id=None):
+    # Families the player caught on other routes than route_id.
+    return {
+        family_id
+        for family_id, route_ids in get_families().get(player_id, {}).items()
+        if route_ids - {route_id}
+    }
+
+
+def family_routes(player_id, family_id):
+    return get_families().get(player_id, {}).get(family_id, frozenset())
+
+
+def is_dupe(player_id, route_id, family_id):
+    if family_id is None:
+        return False
+    return any(other != route_id for other in family_routes(player_id, family_id))
@@ -0,0 +1,169 @@
+import statistics
+import time
+import uuid
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from tracker.forms import EncounterForm
+from tracker.grid import build_tracker_grid
+from tracker.models import Encounter, Player, PlayerType, PokemonSpecies, Route
+from tracker.type_registry import get_type_registry
+
+
+class Rollback(Exception):
+    pass
+
+
+def legacy_encounter_map():
+    # tracker_view before the grid builder: model instances keyed by model instances.
+    players = Player.objects.all()
+    routes = Route.objects.all().order_by("order", "name")
+    encounters = Encounter.objects.select_related(
+        "player", "route", "pokemon_species"
+    ).all()
+    encounter_map = {route: {player: None for player in players} for route in routes}
+    for encounter in encounters:
+        if (
+            encounter.route in encounter_map
+            and encounter.player in encounter_map[encounter.route]
+        ):
+            encounter_map[encounter.route][encounter.player] = encounter
+    return players, routes, encounter_map
+
+
+def render_legacy(type_colors_de):
+    players, routes, encounter_map = legacy_encounter_map()
+    return render_to_string(
+        "tracker/benchmark/legacy_tracker.html",
+        {
+            "players": players,
+            "routes": routes,
+            "encounter_map": encounter_map,
+            "encounter_form": EncounterForm(),
+            # Each cell rendered a token before; a placeholder keeps that cost.
+            "csrf_token": "benchmark",
+            "player_types": PlayerType.objects.select_related("player").order_by(
+                "player__name", "order"
+            ),
+            "all_type_colors_de": dict(type_colors_de),
+            "active_tab": "tracker",
+        },
+    )
+
+
+def render_grid(type_colors_de, grid_version):
+    grid = build_tracker_grid(type_colors_de)
+    # A private grid version keeps the benchmark's fragments apart from real ones.
+    grid["version"] = grid_version
+    html = render_to_string(
+        "tracker/tracker.html",
+        {
+            "grid": grid,
+            "all_type_colors_de": dict(type_colors_de),
+            "status_choices": Encounter.STATUS_CHOICES,
+            "active_tab": "tracker",
+        },
+    )
+    return html, [
+        make_template_fragment_key(
+            "tracker_route_row", [row["route"]["id"], row["version"], grid_version]
+        )
+        for row in grid["rows"]
+    ]
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the tracker page before and after the grid builder on a generated "
+        "run; nothing is kept in the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=10)
+        parser.add_argument("--routes", type=int, default=500)
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Renders per variant; the median is shown"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                results = self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(
+            f"{options['players']} players x {options['routes']} routes, "
+            f"median of {options['repeat']} renders:"
+        )
+        legacy = results["legacy"]
+        for name, label in [
+            ("legacy", "encounter_map (before)"),
+            ("cold", "grid builder, rows rendered"),
+            ("warm", "grid builder, rows from cache"),
+        ]:
+            seconds = results[name]
+            self.stdout.write(
+                f"  {label:<32} {seconds * 1000:8.0f} ms  {legacy / seconds:5.1f}x"
+            )
+
+    def run(self, options):
+        self.create_run(options["players"], options["routes"])
+        type_colors_de = get_type_registry().colors_de
+
+        times = {"legacy": [], "cold": [], "warm": []}
+        fragment_keys = []
+        try:
+            for _ in range(options["repeat"]):
+                seconds, _ = timed(render_legacy, type_colors_de)
+                times["legacy"].append(seconds)
+
+                grid_version = f"benchmark-{uuid.uuid4().hex}"
+                seconds, (_, keys) = timed(render_grid, type_colors_de, grid_version)
+                times["cold"].append(seconds)
+                fragment_keys.extend(keys)
+                seconds, _ = timed(render_grid, type_colors_de, grid_version)
+                times["warm"].append(seconds)
+        finally:
+            cache.delete_many(fragment_keys)
+
+        return {name: statistics.median(values) for name, values in times.items()}
+
+    def create_run(self, player_count, route_count):
+        prefix = f"Benchmark {uuid.uuid4().hex[:8]}"
+        players = Player.objects.bulk_create(
+            Player(name=f"{prefix} {i}") for i in range(player_count)
+        )
+        routes = Route.objects.bulk_create(
+            Route(name=f"{prefix} Route {i}", order=-route_count + i)
+            for i in range(route_count)
+        )
+        species_ids = list(PokemonSpecies.objects.values_list("id", flat=True)[:200])
+        Encounter.objects.bulk_create(
+            (
+                Encounter(
+                    player=player,
+                    route=route,
+                    pokemon_species_id=species_ids[index % len(species_ids)]
+                    if species_ids
+                    else None,
+                    nickname=f"Nick {index}" if species_ids else "",
+                    status="gefangen" if species_ids else "-",
+                )
+                for index, (player, route) in enumerate(
+                    (player, route) for route in routes for player in players
+                )
+            ),
+            batch_size=500,
+            ignore_conflicts=True,
+        )
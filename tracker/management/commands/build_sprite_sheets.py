@@ -0,0 +1,89 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+from tracker.bundle import BundleError, read_bundle, sprite_path
+from tracker.models import PokemonSpecies
+from tracker.pokeapi import PokeAPIClient
+from tracker.sprites import pack_sprite_sheets
+
+
+class Command(BaseCommand):
+    help = "Packs all Pokémon sprites into locally served sprite sheets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bundle",
+            help="Read sprites from a data bundle instead of downloading them",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Maximum number of concurrent sprite downloads",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image  # noqa: F401
+        except ImportError:
+            self.stderr.write(
+                self.style.ERROR("Pillow is required to build sprite sheets: pip install Pillow")
+            )
+            return
+
+        sprites = {}
+        if options["bundle"]:
+            try:
+                bundle = read_bundle(options["bundle"])
+            except (OSError, ValueError, BundleError) as e:
+                self.stderr.write(self.style.ERROR(f"Error reading bundle: {e}"))
+                return
+            sprites = {
+                row["pokedex_id"]: base64.b64decode(row["sprite"])
+                for row in bundle["species"]
+                if row.get("sprite")
+            }
+
+        self.stdout.write("Collecting sprites...")
+        sprites.update(self.collect_sprites(set(sprites), options["workers"]))
+        if not sprites:
+            self.stderr.write(self.style.ERROR("No sprites found."))
+            return
+
+        manifest = pack_sprite_sheets(sprites)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully packed {len(sprites)} sprites into {len(manifest['sheets'])} sheets."
+            )
+        )
+
+    def collect_sprites(self, known_ids, workers):
+        client = PokeAPIClient(pool_size=workers, retries=2)
+        species = (
+            PokemonSpecies.objects.exclude(pokedex_id__in=known_ids)
+            .exclude(sprite_url__isnull=True)
+            .exclude(sprite_url="")
+            .values_list("pokedex_id", "sprite_url")
+        )
+
+        def fetch(pokedex_id, sprite_url):
+            # Downloaded sprites are kept on disk, so each one is fetched only once.
+            path = sprite_path(pokedex_id)
+            if path.exists():
+                return pokedex_id, path.read_bytes()
+            try:
+                sprite = client.get_content(sprite_url)
+            except requests.exceptions.RequestException as e:
+                self.stderr.write(
+                    self.style.WARNING(f"Could not fetch sprite for ID {pokedex_id}: {e}")
+                )
+                return pokedex_id, None
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(sprite)
+            return pokedex_id, sprite
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda row: fetch(*row), species)
+            return {pokedex_id: sprite for pokedex_id, sprite in results if sprite}
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from tracker.bundle import build_bundle, sprite_path, write_bundle
+from tracker.models import PokemonSpecies
+from tracker.pokeapi import PokeAPIClient
+
+DEFAULT_BUNDLE_FILE = settings.BASE_DIR / "nuzlocke_bundle.json.gz"
+
+
+class Command(BaseCommand):
+    help = "Writes species, types, route encounters and optionally sprites into an offline data bundle"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=str(DEFAULT_BUNDLE_FILE),
+            help="Bundle file to write",
+        )
+        parser.add_argument(
+            "--sprites",
+            action="store_true",
+            help="Include sprite images in the bundle",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Maximum number of concurrent sprite downloads",
+        )
+
+    def handle(self, *args, **options):
+        sprites = None
+        if options["sprites"]:
+            self.stdout.write("Collecting sprites...")
+            sprites = self.collect_sprites(options["workers"])
+
+        bundle = build_bundle(sprites)
+        write_bundle(bundle, options["path"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully wrote {len(bundle['species'])} Pokémon, {len(bundle['types'])} types, "
+                f"{len(bundle['route_encounters'])} route encounters "
+                f"and {len(sprites or {})} sprites to {options['path']}."
+            )
+        )
+
+    def collect_sprites(self, workers):
+        client = PokeAPIClient(pool_size=workers, retries=2)
+        species = PokemonSpecies.objects.exclude(sprite_url__isnull=True).exclude(
+            sprite_url=""
+        )
+
+        def fetch(pokedex_id, sprite_url):
+            # Sprites imported from an earlier bundle are read from disk.
+            path = sprite_path(pokedex_id)
+            if path.exists():
+                return pokedex_id, path.read_bytes()
+            try:
+                return pokedex_id, client.get_content(sprite_url)
+            except requests.exceptions.RequestException as e:
+                self.stderr.write(
+                    self.style.WARNING(f"Could not fetch sprite for ID {pokedex_id}: {e}")
+                )
+                return pokedex_id, None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda row: fetch(*row),
+                species.values_list("pokedex_id", "sprite_url"),
+            )
+            return {pokedex_id: sprite for pokedex_id, sprite in results if sprite}
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tracker.bundle import SPRITE_DIR, BundleError, load_bundle, read_bundle
+
+
+class Command(BaseCommand):
+    help = "Loads species, types, sprites and route encounters from an offline data bundle"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Bundle file written by export_bundle")
+        parser.add_argument(
+            "--sprite-dir",
+            default=str(SPRITE_DIR),
+            help="Directory the bundled sprites are written to",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of rows written per bulk insert",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        self.stdout.write(f"Loading data bundle from {options['path']}...")
+
+        try:
+            bundle = read_bundle(options["path"])
+        except (OSError, ValueError, BundleError) as e:
+            self.stderr.write(self.style.ERROR(f"Error reading bundle: {e}"))
+            return
+
+        with transaction.atomic():
+            result = load_bundle(bundle, options["sprite_dir"], options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully loaded {result['species_count']} Pokémon, {result['type_count']} types, "
+                f"{result['matchup_count']} matchups, {result['sprite_count']} sprites and "
+                f"{result['route_encounter_count']} route encounters "
+                f"in {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -1,109 +1,201 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from tracker.models import PokemonSpecies
+from tracker.bundle import store_species
+from tracker.pokeapi import PokeAPIClient
+
+DEFAULT_CACHE_FILE = settings.BASE_DIR / "pokemon_cache.json"
 
 
 class Command(BaseCommand):
     help = "Populates the PokemonSpecies model with German names from PokéAPI"
 
-    def handle(self, *args, **options):
-        self.stdout.write("Fetching Pokémon data from PokéAPI for German names...")
-        limit = 1025
-        base_species_url = f"https://pokeapi.co/api/v2/pokemon-species?limit={limit}"
-        base_pokemon_url = "https://pokeapi.co/api/v2/pokemon/"
-
-        try:
-            response = requests.get(base_species_url)
-            response.raise_for_status()
-            species_list = response.json()["results"]
-
-            count = 0
-            created_count = 0
-            skipped_count = 0
-
-            for species_data in species_list:
-                species_url = species_data["url"]
-                try:
-                    species_detail_response = requests.get(species_url)
-                    species_detail_response.raise_for_status()
-                    species_details = species_detail_response.json()
-
-                    german_name = None
-                    for name_info in species_details.get("names", []):
-                        if name_info["language"]["name"] == "de":
-                            german_name = name_info["name"]
-                            break
-
-                    if not german_name:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f"No German name found for {species_data['name']}. Skipping."
-                            )
-                        )
-                        skipped_count += 1
-                        continue
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=1025, help="Number of species to fetch"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Maximum number of concurrent requests to PokéAPI",
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            default=3,
+            help="Retries per request, with exponential backoff",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of rows written per bulk upsert",
+        )
+        parser.add_argument(
+            "--cache-file",
+            default=str(DEFAULT_CACHE_FILE),
+            help="JSON checkpoint file used to resume interrupted runs",
+        )
+        parser.add_argument(
+            "--from-cache",
+            action="store_true",
+            help="Rebuild PokemonSpecies from the cache file without network access",
+        )
 
-                    pokedex_id = species_details["id"]
+    def handle(self, *args, **options):
+        self.client = PokeAPIClient(
+            base_url=settings.POKEAPI_BASE_URL,
+            cache_dir=settings.POKEAPI_CACHE_DIR,
+            retries=options["retries"],
+            pool_size=options["workers"],
+        )
+        cache_file = options["cache_file"]
+        cache = self.load_cache(cache_file)
+
+        if options["from_cache"]:
+            if not cache:
+                self.stderr.write(
+                    self.style.ERROR(f"No cached Pokémon data found in {cache_file}.")
+                )
+                return
+            self.stdout.write(f"Loading Pokémon data from {cache_file}...")
+        else:
+            self.stdout.write("Fetching Pokémon data from PokéAPI for German names...")
+            try:
+                self.fetch_missing(cache, cache_file, options)
+            except requests.exceptions.RequestException as e:
+                self.stderr.write(
+                    self.style.ERROR(f"Error fetching Pokémon species list: {e}")
+                )
+                return
 
-                    pokemon_detail_url = f"{base_pokemon_url}{pokedex_id}/"
-                    pokemon_detail_response = requests.get(pokemon_detail_url)
+        species_data = [data for data in cache.values() if data]
+        skipped_count = len(cache) - len(species_data)
+        store_species(species_data, options["batch_size"])
 
-                    type1 = None
-                    type2 = None
-                    sprite_url = None
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nSuccessfully processed {len(species_data)} Pokémon. Skipped {skipped_count}. "
+            )
+        )
+
+    def fetch_missing(self, cache, cache_file, options):
+        limit = options["limit"]
+        species_list = self.client.get_json(f"pokemon-species?limit={limit}")["results"]
+        # Entries cached before evolution families were tracked are fetched again.
+        missing = [
+            s
+            for s in species_list
+            if s["name"] not in cache
+            or (cache[s["name"]] and "evolution_family_id" not in cache[s["name"]])
+        ]
+
+        if len(missing) < len(species_list):
+            self.stdout.write(
+                f"Resuming from {cache_file}: {len(species_list) - len(missing)} cached, "
+                f"{len(missing)} remaining."
+            )
 
-                    if pokemon_detail_response.status_code == 200:
-                        pokemon_details = pokemon_detail_response.json()
-                        types = pokemon_details.get("types", [])
-                        type1 = types[0]["type"]["name"] if len(types) > 0 else None
-                        type2 = types[1]["type"]["name"] if len(types) > 1 else None
-                        sprite_url = pokemon_details.get("sprites", {}).get(
-                            "front_default"
+        count = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {
+                executor.submit(self.fetch_species, species_data): species_data
+                for species_data in missing
+            }
+            try:
+                for future in as_completed(futures):
+                    species_data = futures[future]
+                    try:
+                        result, warning = future.result()
+                    except requests.exceptions.RequestException as detail_e:
+                        self.stderr.write(
+                            self.style.ERROR(
+                                f"\nError fetching details for {species_data['name']} from {species_data['url']}: {detail_e}"
+                            )
                         )
-                    else:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f"Could not fetch type/sprite details for ID {pokedex_id} ({german_name}). Status: {pokemon_detail_response.status_code}"
+                        continue
+                    except Exception as e:
+                        self.stderr.write(
+                            self.style.ERROR(
+                                f"\nError processing {species_data['name']}: {e}"
                             )
                         )
+                        continue
+
+                    # Workers only return messages; OutputWrapper is not thread-safe.
+                    if warning:
+                        self.stdout.write(self.style.WARNING(warning))
+                    if result is not False:
+                        cache[species_data["name"]] = result
 
-                    obj, created = PokemonSpecies.objects.update_or_create(
-                        pokedex_id=pokedex_id,
-                        defaults={
-                            "name": german_name,
-                            "type1": type1 if type1 else "unknown",
-                            "type2": type2,
-                            "sprite_url": sprite_url,
-                        },
-                    )
-
-                    if created:
-                        created_count += 1
                     count += 1
                     if count % 10 == 0:
                         self.stdout.write(f".", ending="")
                         self.stdout.flush()
-
-                except requests.exceptions.RequestException as detail_e:
-                    self.stderr.write(
-                        self.style.ERROR(
-                            f"\nError fetching details for {species_data['name']} from {species_url}: {detail_e}"
-                        )
-                    )
-                except Exception as e:
-                    self.stderr.write(
-                        self.style.ERROR(
-                            f"\nError processing {species_data['name']}: {e}"
-                        )
-                    )
-
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"\nSuccessfully processed {count} Pokémon. Created {created_count} new entries. Skipped {skipped_count}. "
-                )
-            )
-
+                    if count % 50 == 0:
+                        self.save_cache(cache, cache_file)
+            except KeyboardInterrupt:
+                # Drop queued requests instead of letting the executor finish them,
+                # and keep whatever the requests still in flight returned.
+                executor.shutdown(cancel_futures=True)
+                for future, species_data in futures.items():
+                    if future.cancelled() or future.exception() is not None:
+                        continue
+                    result, _ = future.result()
+                    if result is not False:
+                        cache[species_data["name"]] = result
+                raise
+            finally:
+                self.save_cache(cache, cache_file)
+
+    def fetch_species(self, species_data):
+        # Runs in a worker thread: returns (data, warning) instead of writing.
+        species_details = self.client.get_json(species_data["url"])
+
+        german_name = None
+        for name_info in species_details.get("names", []):
+            if name_info["language"]["name"] == "de":
+                german_name = name_info["name"]
+                break
+
+        if not german_name:
+            return None, f"No German name found for {species_data['name']}. Skipping."
+
+        pokedex_id = species_details["id"]
+        try:
+            pokemon_details = self.client.get_json(f"pokemon/{pokedex_id}/")
         except requests.exceptions.RequestException as e:
-            self.stderr.write(
-                self.style.ERROR(f"Error fetching Pokémon species list: {e}")
+            # Not cached, so the next run retries this species.
+            return False, (
+                f"Could not fetch type/sprite details for ID {pokedex_id} ({german_name}): {e}"
             )
+
+        types = pokemon_details.get("types", [])
+        chain_url = (species_details.get("evolution_chain") or {}).get("url")
+        return {
+            "pokedex_id": pokedex_id,
+            "name": german_name,
+            "type1": types[0]["type"]["name"] if len(types) > 0 else "unknown",
+            "type2": types[1]["type"]["name"] if len(types) > 1 else None,
+            "sprite_url": pokemon_details.get("sprites", {}).get("front_default"),
+            "evolution_family_id": int(chain_url.rstrip("/").rsplit("/", 1)[-1])
+            if chain_url
+            else None,
+        }, None
+
+    def load_cache(self, cache_file):
+        if not os.path.exists(cache_file):
+            return {}
+        with open(cache_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_cache(self, cache, cache_file):
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
@@ -0,0 +1,139 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from tracker.bundle import store_route_encounters
+from tracker.models import Route
+from tracker.pokeapi import PokeAPIClient
+
+REGIONS = ["johto", "kanto"]
+VERSIONS = ["heartgold", "soulsilver"]
+ROUTE_SLUG = re.compile(r"-route-(\d+)$")
+# PokéAPI ids above this are alternate forms without a species row of their own.
+MAX_POKEDEX_ID = 10000
+
+
+def location_names(location):
+    # German names from PokéAPI, plus "Route N" derived from slugs like "johto-route-29".
+    names = {
+        name_info["name"]
+        for name_info in location.get("names", [])
+        if name_info["language"]["name"] == "de"
+    }
+    match = ROUTE_SLUG.search(location["name"])
+    if match:
+        names.add(f"Route {match.group(1)}")
+    return names
+
+
+def area_encounters(area, versions):
+    # Chances are summed per method and condition set (e.g. time of day), then
+    # the best condition set and version is kept as the route's rate.
+    rates = {}
+    for encounter in area.get("pokemon_encounters", []):
+        pokedex_id = int(encounter["pokemon"]["url"].rstrip("/").rsplit("/", 1)[-1])
+        if pokedex_id > MAX_POKEDEX_ID:
+            continue
+        for version_details in encounter["version_details"]:
+            if version_details["version"]["name"] not in versions:
+                continue
+            chances = {}
+            for details in version_details["encounter_details"]:
+                conditions = frozenset(
+                    value["name"] for value in details.get("condition_values", [])
+                )
+                key = (details["method"]["name"], conditions)
+                chances[key] = chances.get(key, 0) + details["chance"]
+            for (method, _), chance in chances.items():
+                key = (pokedex_id, method)
+                rates[key] = max(rates.get(key, 0), min(chance, 100))
+    return rates
+
+
+class Command(BaseCommand):
+    help = "Populates the per-route encounter tables for HeartGold/SoulSilver from PokéAPI"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Maximum number of concurrent requests to PokéAPI",
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            default=3,
+            help="Retries per request, with exponential backoff",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of rows written per bulk insert",
+        )
+
+    def handle(self, *args, **options):
+        self.client = PokeAPIClient(
+            base_url=settings.POKEAPI_BASE_URL,
+            cache_dir=settings.POKEAPI_CACHE_DIR,
+            retries=options["retries"],
+            pool_size=options["workers"],
+        )
+        route_names = set(Route.objects.values_list("name", flat=True))
+        if not route_names:
+            self.stderr.write(
+                self.style.ERROR("No routes found. Run populate_routes first.")
+            )
+            return
+
+        self.stdout.write("Fetching HeartGold/SoulSilver locations from PokéAPI...")
+        try:
+            locations = [
+                location
+                for region in REGIONS
+                for location in self.client.get_json(f"region/{region}/")["locations"]
+            ]
+            with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                rows = [
+                    row
+                    for location_rows in executor.map(
+                        lambda location: self.fetch_location(location, route_names),
+                        locations,
+                    )
+                    for row in location_rows
+                ]
+        except requests.exceptions.RequestException as e:
+            self.stderr.write(self.style.ERROR(f"Error fetching locations: {e}"))
+            return
+
+        count = store_route_encounters(rows, options["batch_size"])
+
+        matched = {row["route"] for row in rows}
+        for name in sorted(route_names - matched):
+            self.stdout.write(f"No encounter data for route: {name}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nSuccessfully stored {count} encounters for {len(matched)} routes."
+            )
+        )
+
+    def fetch_location(self, location_ref, route_names):
+        location = self.client.get_json(location_ref["url"])
+        matches = location_names(location) & route_names
+        if not matches:
+            return []
+
+        rates = {}
+        for area_ref in location.get("areas", []):
+            area = self.client.get_json(area_ref["url"])
+            for key, rate in area_encounters(area, VERSIONS).items():
+                rates[key] = max(rates.get(key, 0), rate)
+
+        return [
+            {"route": route, "pokedex_id": pokedex_id, "method": method, "rate": rate}
+            for route in matches
+            for (pokedex_id, method), rate in rates.items()
+        ]
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from tracker.models import Route
 
 
@@ -105,27 +106,21 @@ class Command(BaseCommand):
             "Berg Silber",
         ]
 
-        created_count = 0
-        skipped_count = 0
+        with transaction.atomic():
+            route_ids, created = Route.objects.upsert_routes(
+                (name, order) for order, name in enumerate(routes)
+            )
 
+        created_names = set(created)
         for order, name in enumerate(routes):
-            try:
-                route, created = Route.objects.update_or_create(
-                    name=name, defaults={"order": order}
-                )
-
-                if created:
-                    created_count += 1
-                    self.stdout.write(f"Created route: {name} (order: {order})")
-                else:
-                    self.stdout.write(f"Updated route: {name} (order: {order})")
-            except Exception as e:
-                self.stderr.write(self.style.ERROR(f"Error creating route {name}: {e}"))
-                skipped_count += 1
+            if name in created_names:
+                self.stdout.write(f"Created route: {name} (order: {order})")
+            else:
+                self.stdout.write(f"Updated route: {name} (order: {order})")
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"\nSuccessfully processed {len(routes)} routes. "
-                f"Created {created_count} new routes, skipped {skipped_count}."
+                f"\nSuccessfully processed {len(route_ids)} routes. "
+                f"Created {len(created)} new routes."
             )
         )
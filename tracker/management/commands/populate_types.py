@@ -0,0 +1,72 @@
+import json
+
+import requests
+from django.core.management.base import BaseCommand
+from tracker import pokeapi
+from tracker.type_registry import BUNDLED_TYPE_CHART, EXCLUDED_TYPES
+from tracker.typechart import store_types
+
+
+class Command(BaseCommand):
+    help = "Populates the PokemonType and TypeChart models from PokéAPI or the bundled type chart"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Load the bundled type chart instead of fetching it from PokéAPI",
+        )
+
+    def handle(self, *args, **options):
+        if options["offline"]:
+            self.stdout.write(f"Loading type chart from {BUNDLED_TYPE_CHART}...")
+            with open(BUNDLED_TYPE_CHART, encoding="utf-8") as f:
+                types = json.load(f)["types"]
+        else:
+            self.stdout.write("Fetching type chart from PokéAPI...")
+            try:
+                types = self.fetch_types()
+            except requests.exceptions.RequestException as e:
+                self.stderr.write(
+                    self.style.ERROR(
+                        f"Error fetching types from PokéAPI: {e}. "
+                        "Use --offline to load the bundled type chart."
+                    )
+                )
+                return
+
+        type_count, matchup_count = store_types(types)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully stored {type_count} types and {matchup_count} matchups."
+            )
+        )
+
+    def fetch_types(self):
+        types = []
+        for type_info in pokeapi.get_json("type?limit=100")["results"]:
+            if type_info["name"] in EXCLUDED_TYPES:
+                continue
+
+            type_details = pokeapi.get_json(type_info["url"])
+
+            german_name = type_info["name"].capitalize()
+            for name_data in type_details.get("names", []):
+                if name_data["language"]["name"] == "de":
+                    german_name = name_data["name"]
+                    break
+
+            relations = type_details["damage_relations"]
+            types.append(
+                {
+                    "name": type_info["name"],
+                    "name_de": german_name,
+                    "double_damage_to": [
+                        t["name"] for t in relations["double_damage_to"]
+                    ],
+                    "half_damage_to": [t["name"] for t in relations["half_damage_to"]],
+                    "no_damage_to": [t["name"] for t in relations["no_damage_to"]],
+                }
+            )
+        return types
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from tracker.warmup import SHARED_WARMERS, warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the shared cache (German type names, tracker rows) for every server "
+        "process. The type registry, effectiveness and autocomplete live in each "
+        "process's memory and are only warmed by the server itself "
+        "(WARM_CACHES_ON_STARTUP)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of caches warmed in parallel",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            choices=list(SHARED_WARMERS),
+            help="Warm only the given caches",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Warming caches...")
+        started = time.perf_counter()
+
+        try:
+            results = warm_caches(
+                options["only"] or list(SHARED_WARMERS), options["workers"]
+            )
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error warming caches: {e}"))
+            return
+
+        for name, count, seconds in results:
+            self.stdout.write(f"  {name}: {count} entries in {seconds * 1000:.0f} ms")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully warmed caches in {(time.perf_counter() - started) * 1000:.0f} ms."
+            )
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PokemonType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('german_name', models.CharField(max_length=50)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TypeChart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attacking_type', models.CharField(max_length=50)),
+                ('defending_type', models.CharField(max_length=50)),
+                ('multiplier', models.FloatField(default=1.0)),
+            ],
+            options={
+                'ordering': ['attacking_type', 'defending_type'],
+                'unique_together': {('attacking_type', 'defending_type')},
+            },
+        ),
+    ]
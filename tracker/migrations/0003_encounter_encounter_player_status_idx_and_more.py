@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:13
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_pokemontype_typechart'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='encounter',
+            index=models.Index(fields=['player', 'status'], name='encounter_player_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemonspecies',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='pokemonspecies_upper_name_idx'),
+        ),
+    ]
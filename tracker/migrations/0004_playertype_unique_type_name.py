@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+
+def remove_duplicate_type_assignments(apps, schema_editor):
+    # Concurrent assignments could leave a type with several players; keep the oldest.
+    PlayerType = apps.get_model('tracker', 'PlayerType')
+    seen = set()
+    duplicate_ids = []
+    for assignment_id, type_name in PlayerType.objects.order_by('id').values_list('id', 'type_name'):
+        if type_name in seen:
+            duplicate_ids.append(assignment_id)
+        seen.add(type_name)
+    PlayerType.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_encounter_encounter_player_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='playertype',
+            unique_together=set(),
+        ),
+        migrations.RunPython(remove_duplicate_type_assignments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='playertype',
+            constraint=models.UniqueConstraint(fields=('type_name',), name='playertype_unique_type_name'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+# Frozen copy of tracker.typechart.TYPE_ORDER as of this migration.
+TYPE_ORDER = [
+    'normal', 'fire', 'water', 'electric', 'grass', 'ice', 'fighting', 'poison',
+    'ground', 'flying', 'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark',
+    'steel', 'fairy',
+]
+
+
+def backfill_type_masks(apps, schema_editor):
+    PokemonSpecies = apps.get_model('tracker', 'PokemonSpecies')
+    species = list(PokemonSpecies.objects.only('id', 'type1', 'type2'))
+    for row in species:
+        row.type_mask = 0
+        for type_name in (row.type1, row.type2):
+            if type_name in TYPE_ORDER:
+                row.type_mask |= 1 << TYPE_ORDER.index(type_name)
+    PokemonSpecies.objects.bulk_update(species, ['type_mask'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_playertype_unique_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokemonspecies',
+            name='type_mask',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_type_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_pokemonspecies_type_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokemonspecies',
+            name='evolution_family_id',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_pokemonspecies_evolution_family_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteEncounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=50)),
+                ('rate', models.PositiveSmallIntegerField(default=0)),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='encounter_table', to='tracker.route')),
+                ('species', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tracker.pokemonspecies')),
+            ],
+            options={
+                'ordering': ['route', '-rate', 'species'],
+                'constraints': [models.UniqueConstraint(fields=('route', 'species', 'method'), name='routeencounter_unique_route_species_method')],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models.functions import Upper
 
 
 class Player(models.Model):
@@ -8,10 +9,46 @@ class Player(models.Model):
         return self.name
 
 
+class RouteManager(models.Manager):
+    def upsert_routes(self, routes, update_order=True, batch_size=500):
+        # routes: (name, order) pairs. Every player gets an encounter row per route.
+        orders = dict(routes)
+        existing = set(self.filter(name__in=orders).values_list("name", flat=True))
+
+        new_routes = [self.model(name=name, order=order) for name, order in orders.items()]
+        if update_order:
+            self.bulk_create(
+                new_routes,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["name"],
+                update_fields=["order"],
+            )
+        else:
+            self.bulk_create(new_routes, batch_size=batch_size, ignore_conflicts=True)
+
+        route_ids = dict(self.filter(name__in=orders).values_list("name", "id"))
+        player_ids = list(Player.objects.values_list("id", flat=True))
+        Encounter.objects.bulk_create(
+            [
+                Encounter(player_id=player_id, route_id=route_id, status="-")
+                for route_id in route_ids.values()
+                for player_id in player_ids
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+        created = [name for name in orders if name not in existing]
+        return route_ids, created
+
+
 class Route(models.Model):
     name = models.CharField(max_length=100, unique=True)
     order = models.IntegerField(default=0)
 
+    objects = RouteManager()
+
     class Meta:
         ordering = ["order", "name"]
 
@@ -25,6 +62,15 @@ class PokemonSpecies(models.Model):
     type1 = models.CharField(max_length=50)
     type2 = models.CharField(max_length=50, blank=True, null=True)
     sprite_url = models.URLField(blank=True, null=True)
+    # Bit i set for typechart.TYPE_ORDER[i], kept in sync with type1/type2.
+    type_mask = models.PositiveIntegerField(default=0)
+    # PokéAPI evolution chain id, shared by every species of one evolution line.
+    evolution_family_id = models.IntegerField(blank=True, null=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(Upper("name"), name="pokemonspecies_upper_name_idx"),
+        ]
 
     def __str__(self):
         return self.name.capitalize()
@@ -53,6 +99,9 @@ class Encounter(models.Model):
     class Meta:
         unique_together = ("player", "route")
         ordering = ["route__order", "route__name", "player__name"]
+        indexes = [
+            models.Index(fields=["player", "status"], name="encounter_player_status_idx"),
+        ]
 
     def __str__(self):
         poke_name = (
@@ -63,6 +112,55 @@ class Encounter(models.Model):
         return f"{self.player.name} @ {self.route.name}: {self.nickname or poke_name} ({self.get_status_display()})"
 
 
+class PlayerTypeManager(models.Manager):
+    def lock_player(self, player_id):
+        if connection.features.has_select_for_update:
+            list(
+                Player.objects.select_for_update()
+                .filter(pk=player_id)
+                .values_list("id", flat=True)
+            )
+        else:
+            # SQLite has no row locks. Writing first takes the database write
+            # lock, waiting for other writers; upgrading from a read later
+            # fails with "database is locked" instead of waiting.
+            Player.objects.filter(pk=player_id).update(name=models.F("name"))
+
+    def assign(self, player_id, type_name):
+        # Call inside a transaction. Returns (assignment id, previous player id);
+        # the previous player id equals player_id if nothing changed.
+        # Assignments to one player queue up on its row. PostgreSQL reads
+        # MAX(order) from a snapshot taken when a statement starts, so the lock
+        # is taken before the upsert rather than inside it.
+        self.lock_player(player_id)
+        previous = (
+            self.select_for_update()
+            .filter(type_name=type_name)
+            .values_list("id", "player_id")
+            .first()
+        )
+        if previous is not None and previous[1] == player_id:
+            return previous
+
+        # Moving the type and computing the next order is one statement.
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        order = connection.ops.quote_name("order")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (player_id, type_name, {order})
+                SELECT %s, %s, COALESCE(MAX({order}) + 1, 0)
+                FROM {table} WHERE player_id = %s
+                ON CONFLICT (type_name) DO UPDATE
+                SET player_id = EXCLUDED.player_id, {order} = EXCLUDED.{order}
+                RETURNING id
+                """,
+                [player_id, type_name, player_id],
+            )
+            (assignment_id,) = cursor.fetchone()
+        return assignment_id, previous[1] if previous else None
+
+
 class PlayerType(models.Model):
     player = models.ForeignKey(
         Player, on_delete=models.CASCADE, related_name="assigned_types"
@@ -70,9 +168,61 @@ class PlayerType(models.Model):
     type_name = models.CharField(max_length=50)
     order = models.IntegerField(default=0)
 
+    objects = PlayerTypeManager()
+
     class Meta:
-        unique_together = ("player", "type_name")
         ordering = ["player", "order", "type_name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["type_name"], name="playertype_unique_type_name"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.player.name} - {self.type_name} (Order: {self.order})"
+
+
+class PokemonType(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    german_name = models.CharField(max_length=50)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.german_name} ({self.name})"
+
+
+class TypeChart(models.Model):
+    attacking_type = models.CharField(max_length=50)
+    defending_type = models.CharField(max_length=50)
+    multiplier = models.FloatField(default=1.0)
+
+    class Meta:
+        unique_together = ("attacking_type", "defending_type")
+        ordering = ["attacking_type", "defending_type"]
+
+    def __str__(self):
+        return f"{self.attacking_type} -> {self.defending_type}: {self.multiplier}x"
+
+
+class RouteEncounter(models.Model):
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="encounter_table"
+    )
+    species = models.ForeignKey(PokemonSpecies, on_delete=models.CASCADE)
+    method = models.CharField(max_length=50)
+    # Highest encounter chance in percent across versions and conditions.
+    rate = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["route", "-rate", "species"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["route", "species", "method"],
+                name="routeencounter_unique_route_species_method",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.route.name}: {self.species} ({self.method}, {self.rate}%)"
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://pokeapi.co/api/v2/"
+# (connect, read) in seconds, so a slow API can never hang a worker.
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_POOL_SIZE = 10
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            # After reset_timeout the next request is let through as a probe.
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class PokeAPIClient:
+    def __init__(
+        self,
+        base_url=BASE_URL,
+        cache_dir=None,
+        timeout=DEFAULT_TIMEOUT,
+        retries=0,
+        pool_size=DEFAULT_POOL_SIZE,
+        breaker=None,
+    ):
+        self.base_url = base_url
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.timeout = timeout
+        self.retries = retries
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        if path.startswith(("http://", "https://")):
+            return path
+        return self.base_url.rstrip("/") + "/" + path.lstrip("/")
+
+    def cache_path(self, url):
+        return self.cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def read_cache(self, url):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self.cache_path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_cache(self, url, etag, data):
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": etag, "data": data}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def send(self, url, headers=None, retries=None):
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+            except requests.exceptions.RequestException:
+                self.breaker.record_failure()
+                if attempt == retries:
+                    raise
+                time.sleep(0.5 * 2**attempt)
+                continue
+
+            self.breaker.record_success()
+            return response
+
+    def get_json(self, path, retries=None):
+        url = self.url(path)
+        cached = self.read_cache(url)
+
+        if not self.breaker.allow():
+            # While the API is unreachable, cached responses are still served.
+            if cached is not None:
+                return cached["data"]
+            raise CircuitOpenError(f"PokéAPI circuit is open, skipping {url}")
+
+        headers = {}
+        if cached is not None and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        try:
+            response = self.send(url, headers, retries)
+        except requests.exceptions.RequestException:
+            if cached is not None:
+                return cached["data"]
+            raise
+
+        if response.status_code == 304 and cached is not None:
+            return cached["data"]
+
+        response.raise_for_status()
+        data = response.json()
+        self.write_cache(url, response.headers.get("ETag"), data)
+        return data
+
+    def get_content(self, url, retries=None):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"PokéAPI circuit is open, skipping {url}")
+
+        response = self.send(url, retries=retries)
+        response.raise_for_status()
+        return response.content
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PokeAPIClient(
+                    base_url=settings.POKEAPI_BASE_URL,
+                    cache_dir=settings.POKEAPI_CACHE_DIR,
+                )
+    return _client
+
+
+def get_json(path, retries=None):
+    return get_client().get_json(path, retries)
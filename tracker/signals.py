@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import autocomplete, events, legality
+from .grid import bump_grid, bump_route_rows
+from .models import Encounter, Player, PlayerType, PokemonSpecies, Route
+from .typechart import type_mask
+
+
+@receiver(post_save, sender=Encounter)
+def encounter_saved(sender, instance, **kwargs):
+    def on_commit():
+        bump_route_rows([instance.route_id])
+        legality.invalidate_families()
+        events.publish_encounter(instance)
+
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_delete, sender=Encounter)
+def encounter_deleted(sender, instance, **kwargs):
+    def on_commit():
+        bump_route_rows([instance.route_id])
+        legality.invalidate_families()
+        events.publish_encounter(instance, deleted=True)
+
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_save, sender=Route)
+def route_changed(sender, instance, **kwargs):
+    route_id = instance.pk
+    transaction.on_commit(lambda: bump_route_rows([route_id]))
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def player_changed(sender, instance, **kwargs):
+    transaction.on_commit(bump_grid)
+
+
+@receiver(post_save, sender=PlayerType)
+@receiver(post_delete, sender=PlayerType)
+def player_type_changed(sender, instance, **kwargs):
+    player_id = instance.player_id
+
+    def on_commit():
+        legality.invalidate()
+        events.publish_player_types(player_id)
+
+    transaction.on_commit(on_commit)
+
+
+@receiver(pre_save, sender=PokemonSpecies)
+def species_saving(sender, instance, **kwargs):
+    instance.type_mask = type_mask(instance.type1, instance.type2)
+
+
+@receiver(post_save, sender=PokemonSpecies)
+@receiver(post_delete, sender=PokemonSpecies)
+def species_changed(sender, instance, **kwargs):
+    transaction.on_commit(autocomplete.invalidate)
+    transaction.on_commit(legality.invalidate_families)
+    transaction.on_commit(bump_grid)
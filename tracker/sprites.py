@@ -0,0 +1,175 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+from django.templatetags.static import static
+
+from .bundle import SPRITE_DIR, sprite_path
+
+SPRITE_SIZE = 96
+SHEET_COLUMNS = 16
+SHEET_ROWS = 16
+MANIFEST_FILE = "sprites.json"
+
+_manifest = None
+_manifest_version = None
+_manifest_loaded = False
+_manifest_lock = threading.Lock()
+
+
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()[:12]
+
+
+def pack_sprite_sheets(sprites, sprite_dir=SPRITE_DIR):
+    # sprites: {pokedex_id: png bytes}. Pillow is only needed to build the sheets.
+    from PIL import Image
+
+    sprite_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(sprite_dir)
+
+    per_sheet = SHEET_COLUMNS * SHEET_ROWS
+    pokedex_ids = sorted(sprites)
+    sheets = []
+    # Pages showing a single sprite load it on its own instead of a whole sheet.
+    single_sprites = {}
+    css_rules = [
+        f".sprite{{display:inline-block;width:{SPRITE_SIZE}px;height:{SPRITE_SIZE}px;"
+        "background-repeat:no-repeat;image-rendering:pixelated}"
+    ]
+
+    for sheet_index, start in enumerate(range(0, len(pokedex_ids), per_sheet)):
+        sheet_ids = pokedex_ids[start : start + per_sheet]
+        rows = -(-len(sheet_ids) // SHEET_COLUMNS)
+        sheet = Image.new(
+            "RGBA", (SHEET_COLUMNS * SPRITE_SIZE, rows * SPRITE_SIZE), (0, 0, 0, 0)
+        )
+        offsets = {}
+        for position, pokedex_id in enumerate(sheet_ids):
+            sprite = Image.open(io.BytesIO(sprites[pokedex_id])).convert("RGBA")
+            sprite.thumbnail((SPRITE_SIZE, SPRITE_SIZE))
+            single_sprites[pokedex_id] = write_png(
+                sprite, f"sprite-{pokedex_id}", sprite_dir
+            )
+            x = position % SHEET_COLUMNS * SPRITE_SIZE
+            y = position // SHEET_COLUMNS * SPRITE_SIZE
+            sheet.paste(
+                sprite,
+                (x + (SPRITE_SIZE - sprite.width) // 2, y + (SPRITE_SIZE - sprite.height) // 2),
+            )
+            offsets[pokedex_id] = (x, y)
+
+        sheet_name = write_png(sheet, f"sheet-{sheet_index}", sprite_dir)
+        sheets.append(sheet_name)
+
+        for pokedex_id, (x, y) in offsets.items():
+            css_rules.append(
+                f".sprite-{pokedex_id}{{background-image:url({sheet_name});"
+                f"background-position:-{x}px -{y}px}}"
+            )
+
+    css = "\n".join(css_rules).encode("utf-8")
+    css_name = f"sprites.{content_hash(css)}.css"
+    (sprite_dir / css_name).write_bytes(css)
+
+    manifest = {
+        "css": css_name,
+        "sheets": sheets,
+        "sprites": single_sprites,
+        "pokedex_ids": pokedex_ids,
+    }
+    tmp_path = sprite_dir / f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, sprite_dir / MANIFEST_FILE)
+
+    # Pages rendered before the switch still reference the previous
+    # generation, so only older files are removed.
+    keep = generation_files(manifest)
+    if previous is not None:
+        keep.update(generation_files(previous))
+    for old_file in [
+        *sprite_dir.glob("sheet-*.png"),
+        *sprite_dir.glob("sprite-*.png"),
+        *sprite_dir.glob("sprites.*.css"),
+    ]:
+        if old_file.name not in keep:
+            old_file.unlink()
+    return manifest
+
+
+def write_png(image, prefix, sprite_dir):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    data = buffer.getvalue()
+    name = f"{prefix}.{content_hash(data)}.png"
+    (sprite_dir / name).write_bytes(data)
+    return name
+
+
+def generation_files(manifest):
+    return {manifest["css"], *manifest["sheets"], *manifest["sprites"].values()}
+
+
+def load_manifest(sprite_dir=SPRITE_DIR):
+    try:
+        with open(sprite_dir / MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    manifest["pokedex_ids"] = frozenset(manifest["pokedex_ids"])
+    # JSON keys are strings; manifests from before single sprites have none.
+    manifest["sprites"] = {
+        int(pokedex_id): name for pokedex_id, name in manifest.get("sprites", {}).items()
+    }
+    return manifest
+
+
+def manifest_version(sprite_dir=SPRITE_DIR):
+    # The manifest is replaced atomically, so its stat changes with every pack,
+    # whichever process packed it.
+    try:
+        stat = os.stat(sprite_dir / MANIFEST_FILE)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+
+def get_manifest():
+    global _manifest, _manifest_version, _manifest_loaded
+
+    version = manifest_version()
+    if _manifest_loaded and version == _manifest_version:
+        return _manifest
+
+    with _manifest_lock:
+        if not _manifest_loaded or version != _manifest_version:
+            _manifest = load_manifest()
+            _manifest_version = version
+            _manifest_loaded = True
+    return _manifest
+
+
+def sprite_class(pokedex_id):
+    manifest = get_manifest()
+    if manifest is None or pokedex_id not in manifest["pokedex_ids"]:
+        return None
+    return f"sprite sprite-{pokedex_id}"
+
+
+def sprite_url(pokedex_id, sprite_dir=SPRITE_DIR):
+    manifest = get_manifest() if sprite_dir == SPRITE_DIR else load_manifest(sprite_dir)
+    if manifest is not None and pokedex_id in manifest["sprites"]:
+        name = manifest["sprites"][pokedex_id]
+    elif sprite_path(pokedex_id, sprite_dir).exists():
+        # Written by import_bundle, before any sheets were packed.
+        name = f"{pokedex_id}.png"
+    else:
+        return None
+    try:
+        return static(f"tracker/sprites/{name}")
+    except ValueError:
+        # Not collected yet; collectstatic has to run after new sprites.
+        return None
@@ -0,0 +1,1155 @@
+import base64
+import io
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+from pathlib import Path
+from unittest import mock, skipUnless
+
+import requests
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.templatetags.static import static
+from django.urls import reverse
+
+from . import autocomplete, caching, legality, pokeapi, sprites, type_registry, warmup
+from .bundle import load_bundle, store_species
+from .grid import build_tracker_grid
+from .management.commands.benchmark_tracker import legacy_encounter_map
+from .importer import import_run
+from .pokeapi import CircuitBreaker, CircuitOpenError, PokeAPIClient
+from .models import Encounter, Player, PlayerType, PokemonSpecies, Route
+from .type_registry import BUNDLED_TYPE_CHART, get_type_registry
+from .typechart import (
+    effectiveness_for,
+    grouped_effectiveness,
+    grouped_effectiveness_batch,
+    store_types,
+    type_mask,
+)
+
+# Tests never touch the file or database cache of a running development server.
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tracker-tests",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
+
+# Tests do not run collectstatic, so there is no manifest of hashed names.
+TEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def reset_caches():
+    cache.clear()
+    # Process-local indexes outlive the rolled-back rows of earlier tests;
+    # fresh version tokens make them rebuild from this test's data.
+    autocomplete.invalidate()
+    autocomplete.invalidate_routes()
+    legality.invalidate()
+    legality.invalidate_families()
+    type_registry.invalidate()
+
+
+def create_types():
+    with open(BUNDLED_TYPE_CHART, encoding="utf-8") as f:
+        store_types(json.load(f)["types"])
+
+
+def create_species():
+    species = [
+        (1, "Bisasam", "grass", "poison", 1),
+        (2, "Bisaknosp", "grass", "poison", 1),
+        (4, "Glumanda", "fire", None, 2),
+        (6, "Glurak", "fire", "flying", 2),
+        (7, "Schiggy", "water", None, 3),
+        (25, "Pikachu", "electric", None, 10),
+    ]
+    PokemonSpecies.objects.bulk_create(
+        PokemonSpecies(
+            pokedex_id=pokedex_id,
+            name=name,
+            type1=type1,
+            type2=type2,
+            type_mask=type_mask(type1, type2),
+            evolution_family_id=family_id,
+        )
+        for pokedex_id, name, type1, type2, family_id in species
+    )
+
+
+def create_run(player_count, route_count):
+    Player.objects.bulk_create(Player(name=f"Spieler {i}") for i in range(player_count))
+    route_ids, _ = Route.objects.upsert_routes(
+        (f"Route {i}", i) for i in range(route_count)
+    )
+    return list(Player.objects.order_by("name")), [
+        route_ids[f"Route {i}"] for i in range(route_count)
+    ]
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class TrackerTestCase(TestCase):
+    def setUp(self):
+        reset_caches()
+
+
+class TrackerGridTests(TrackerTestCase):
+    def create_large_run(self):
+        create_types()
+        create_species()
+        create_run(10, 500)
+        species_ids = list(PokemonSpecies.objects.values_list("id", flat=True))
+        encounters = list(Encounter.objects.all())
+        for index, encounter in enumerate(encounters):
+            if index % 3:
+                encounter.pokemon_species_id = species_ids[index % len(species_ids)]
+                encounter.nickname = f"Nick {index}"
+                encounter.status = "gefangen"
+        Encounter.objects.bulk_update(
+            encounters, ["pokemon_species", "nickname", "status"], batch_size=500
+        )
+        self.assertEqual(len(encounters), 10 * 500)
+
+    def test_large_grid_is_built_with_constant_queries(self):
+        self.create_large_run()
+        type_colors_de = get_type_registry().colors_de
+
+        # Players, routes, player types and encounters, whatever the grid size.
+        with self.assertNumQueries(4):
+            grid = build_tracker_grid(type_colors_de)
+        self.assertEqual(len(grid["rows"]), 500)
+        self.assertEqual(len(grid["rows"][0]["cells"]), 10)
+
+    def test_grid_matches_legacy_encounter_map(self):
+        self.create_large_run()
+        grid = build_tracker_grid(get_type_registry().colors_de)
+        players, routes, encounter_map = legacy_encounter_map()
+
+        self.assertEqual(
+            [player["id"] for player in grid["players"]], sorted(p.id for p in players)
+        )
+        self.assertEqual([row["route"]["id"] for row in grid["rows"]], [r.id for r in routes])
+        for row, route in zip(grid["rows"], routes):
+            for cell in row["cells"]:
+                encounter = encounter_map[route][
+                    next(p for p in players if p.id == cell["player_id"])
+                ]
+                self.assertEqual(
+                    (
+                        cell["pokemon_species_id"],
+                        cell["pokemon_name"],
+                        cell["nickname"],
+                        cell["status"],
+                    ),
+                    (
+                        encounter.pokemon_species_id,
+                        encounter.pokemon_species.name if encounter.pokemon_species else "",
+                        encounter.nickname or "",
+                        encounter.status,
+                    ),
+                )
+
+    def test_cached_rows_render_the_same_page(self):
+        create_types()
+        create_species()
+        create_run(3, 20)
+        cold = self.client.get(reverse("tracker_view"))
+        with self.assertNumQueries(4):
+            warm = self.client.get(reverse("tracker_view"))
+        self.assertEqual(warm.content, cold.content)
+
+
+class RouteRowTests(TrackerTestCase):
+    def post_action(self, data):
+        return self.client.post(
+            reverse("tracker_view"), data, HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+
+    def test_added_route_is_returned_as_row_markup(self):
+        create_types()
+        players, route_ids = create_run(2, 2)
+
+        response = self.post_action({"action": "add_route", "route_name": "Vertania-Wald"})
+        data = response.json()
+
+        self.assertEqual(data["status"], "success")
+        self.assertIn(f'data-route-id="{data["route_id"]}"', data["html"])
+        self.assertEqual(data["html"].count('class="encounter-form'), len(players))
+        # New routes are placed first, so clients insert them before the old first row.
+        self.assertEqual(data["before_route_id"], route_ids[0])
+
+    def test_deleted_route_is_removed(self):
+        create_types()
+        _, route_ids = create_run(2, 2)
+
+        response = self.post_action({"action": "delete_route", "route": route_ids[0]})
+
+        self.assertEqual(response.json()["status"], "success")
+        self.assertFalse(Route.objects.filter(pk=route_ids[0]).exists())
+
+
+class ImportRunTests(TrackerTestCase):
+    def run_data(self, players, route_count):
+        encounters = [
+            {
+                "player_name": player.name,
+                "route_name": f"Route {route}",
+                "pokemon_name": "glumanda",
+                "nickname": f"Nick {route}",
+                "status": "gefangen",
+            }
+            for player in players
+            for route in range(route_count)
+        ]
+        player_types = [
+            {"player_name": player.name, "type_name": type_name, "order": 0}
+            for player, type_name in zip(players, ["Feuer", "Wasser", "Pflanze"])
+        ]
+        return encounters, player_types
+
+    def test_import_runs_with_constant_queries(self):
+        create_species()
+        # 600 and 1500 rows. Django 5.2 assumes SQLite's old limit of 999 parameters
+        # and would split the upsert; the connection's real limit is used instead,
+        # as PostgreSQL has none.
+        max_query_params = connection.features.max_query_params
+        if connection.vendor == "sqlite":
+            connection.ensure_connection()
+            max_query_params = connection.connection.getlimit(
+                sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER
+            )
+        for player_count, route_count in [(10, 60), (15, 100)]:
+            with self.subTest(players=player_count, routes=route_count):
+                Player.objects.all().delete()
+                Route.objects.all().delete()
+                players, _ = create_run(player_count, route_count)
+                encounters, player_types = self.run_data(players, route_count)
+
+                # Players, routes and species are read once each, the encounters
+                # written in one upsert and the types replaced.
+                with mock.patch.object(
+                    connection.features, "max_query_params", max_query_params
+                ), self.assertNumQueries(6):
+                    result = import_run(encounters, player_types)
+
+                self.assertEqual(result["errors"], [])
+                self.assertEqual(result["encounter_count"], player_count * route_count)
+                self.assertEqual(
+                    Encounter.objects.filter(
+                        pokemon_species__name="Glumanda", status="gefangen"
+                    ).count(),
+                    player_count * route_count,
+                )
+
+    def test_invalid_rows_are_reported_per_row(self):
+        create_species()
+        players, _ = create_run(1, 1)
+        player = players[0].name
+        encounters = [
+            {"player_name": player, "route_name": "Route 0", "pokemon_name": ["Glumanda"]},
+            {"player_name": player, "route_name": "Route 0", "pokemon_name": "Digimon"},
+            {"player_name": 7, "route_name": "Route 0"},
+            {"player_name": player, "route_name": {"name": "Route 0"}},
+            {"player_name": player, "route_name": "Route 0", "nickname": 12},
+            {"player_name": player, "route_name": "Route 0", "status": ["gefangen"]},
+            {"player_name": player, "route_name": "Route 0", "pokemon_name": "Schiggy"},
+        ]
+        player_types = [
+            {"player_name": player, "type_name": "Wasser", "order": "erster"},
+        ]
+
+        result = import_run(encounters, player_types)
+
+        self.assertEqual(result["encounter_count"], 1)
+        self.assertEqual(result["type_count"], 0)
+        self.assertEqual(
+            [(error["type"], error["row"]) for error in result["errors"]],
+            [("encounter", row) for row in range(6)] + [("player_type", 0)],
+        )
+        self.assertEqual(
+            Encounter.objects.get(player__name=player).pokemon_species.name, "Schiggy"
+        )
+
+
+class ExportTests(TrackerTestCase):
+    async def test_export_streams_asynchronously_under_asgi(self):
+        await sync_to_async(create_species)()
+        players, _ = await sync_to_async(create_run)(2, 3)
+
+        response = await self.async_client.get(
+            reverse("export_run_view"), {"format": "ndjson"}
+        )
+
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+        self.assertEqual(len(rows), 2 * 3)
+        self.assertEqual({row["player_name"] for row in rows}, {p.name for p in players})
+
+    def test_gzip_flag_is_parsed_as_boolean(self):
+        create_run(1, 1)
+        url = reverse("export_run_view")
+        for value, compressed in [
+            ("1", True),
+            ("true", True),
+            ("0", False),
+            ("false", False),
+            ("", False),
+        ]:
+            with self.subTest(gzip=value):
+                response = self.client.get(url, {"gzip": value})
+                self.assertEqual(response.status_code, 200)
+                content = b"".join(response.streaming_content)
+                self.assertEqual(response["Content-Type"] == "application/gzip", compressed)
+                self.assertEqual(content.startswith(b"\x1f\x8b"), compressed)
+
+        self.assertEqual(self.client.get(url, {"gzip": "vielleicht"}).status_code, 400)
+
+
+class WarmupTests(TrackerTestCase):
+    # The command runs these in worker threads, which cannot see the test's
+    # transaction, so they are called directly.
+    def test_shared_warmers_fill_the_shared_cache(self):
+        create_types()
+        create_run(2, 3)
+        version = cache.get(type_registry.REGISTRY_VERSION_KEY)
+        names_key = type_registry.TYPE_NAMES_CACHE_KEY.format(version)
+
+        self.assertEqual(set(warmup.SHARED_WARMERS), {"type_names", "route_rows"})
+        for warmer in warmup.SHARED_WARMERS.values():
+            warmer()
+
+        self.assertEqual(cache.get(names_key)["value"]["fire"], "Feuer")
+        grid = build_tracker_grid(get_type_registry().colors_de)
+        keys = [
+            make_template_fragment_key(
+                "tracker_route_row", [row["route"]["id"], row["version"], grid["version"]]
+            )
+            for row in grid["rows"]
+        ]
+        self.assertEqual(len(cache.get_many(keys)), 3)
+
+
+class QueryCountTests(TrackerTestCase):
+    # Every page and action is counted on a small run and again on a larger one;
+    # the counts must not grow with players or routes.
+    SIZES = [(3, 5), (6, 12)]
+
+    def setUp(self):
+        create_types()
+        create_species()
+        super().setUp()
+
+    def create_run(self, player_count, route_count):
+        Player.objects.all().delete()
+        Route.objects.all().delete()
+        self.players, self.route_ids = create_run(player_count, route_count)
+        PlayerType.objects.create(player=self.players[0], type_name="Feuer")
+        PlayerType.objects.create(player=self.players[1], type_name="Wasser")
+        Encounter.objects.filter(route_id=self.route_ids[0]).update(
+            pokemon_species=PokemonSpecies.objects.get(name="Glumanda"),
+            status="gefangen",
+        )
+        reset_caches()
+
+    def assertQueriesAtEachSize(self, num, prepare, registry_loaded=False):
+        # prepare() runs uncounted on the fresh run and returns the request to count.
+        # Commit callbacks run inside the count, as they would after a request.
+        for player_count, route_count in self.SIZES:
+            with self.subTest(players=player_count, routes=route_count):
+                self.create_run(player_count, route_count)
+                if registry_loaded:
+                    get_type_registry()
+                request = prepare()
+                with self.assertNumQueries(num), self.captureOnCommitCallbacks(
+                    execute=True
+                ):
+                    response = request()
+                self.assertLess(response.status_code, 400)
+
+    def get(self, name, params=None):
+        return lambda: lambda: self.client.get(reverse(name), params)
+
+    def post(self, name, data):
+        def prepare():
+            values = {
+                key: value() if callable(value) else value
+                for key, value in data.items()
+            }
+            return lambda: self.client.post(
+                reverse(name), values, headers={"X-Requested-With": "XMLHttpRequest"}
+            )
+
+        return prepare
+
+    def test_tracker(self):
+        # Type registry, players, routes, player types and encounters.
+        self.assertQueriesAtEachSize(5, self.get("tracker_view"))
+
+    def test_status_summary(self):
+        self.assertQueriesAtEachSize(3, self.get("status_summary_view"))
+
+    def test_static_pages(self):
+        self.assertQueriesAtEachSize(0, self.get("boss_view"))
+        self.assertQueriesAtEachSize(0, self.get("rules_view"))
+
+    # The type registry is process-wide; these pages count it as loaded.
+    def test_player_types(self):
+        self.assertQueriesAtEachSize(
+            2, self.get("player_types_view"), registry_loaded=True
+        )
+
+    def test_type_wheel(self):
+        self.assertQueriesAtEachSize(
+            2, self.get("type_wheel_view"), registry_loaded=True
+        )
+
+    def test_weakness(self):
+        self.assertQueriesAtEachSize(
+            2,
+            self.get("strength_weakness_view", {"pokemon_name": "Glurak"}),
+            registry_loaded=True,
+        )
+
+    def test_autocomplete(self):
+        # Route encounter tables and the species index, each loaded once.
+        self.assertQueriesAtEachSize(
+            2, self.get("pokemon_autocomplete", {"term": "gl"})
+        )
+
+    def test_export(self):
+        def export():
+            response = self.client.get(reverse("export_run_view"))
+            b"".join(response.streaming_content)
+            return response
+
+        # Players and encounters, streamed with iterator().
+        self.assertQueriesAtEachSize(2, lambda: export)
+
+    def test_event_stream_under_wsgi(self):
+        self.assertQueriesAtEachSize(0, self.get("event_stream"))
+
+    def test_batch_save(self):
+        def save():
+            updates = [
+                {
+                    "player": self.players[0].id,
+                    "route": route_id,
+                    "pokemon_name": "Glumanda",
+                    "nickname": "",
+                    "status": "gefangen",
+                }
+                for route_id in self.route_ids[:5]
+            ]
+            return self.client.post(
+                reverse("save_encounters_view"),
+                json.dumps({"updates": updates}),
+                content_type="application/json",
+            )
+
+        # Three lookups, the type registry and legality caches, then one locked
+        # read and one UPDATE inside a savepoint.
+        self.assertQueriesAtEachSize(10, lambda: save)
+
+    def tracker_action(self, action, **data):
+        return self.post(
+            "tracker_view",
+            {
+                "action": action,
+                "player": lambda: self.players[0].id,
+                "route": lambda: self.route_ids[0],
+                **data,
+            },
+        )
+
+    def test_tracker_save(self):
+        self.assertQueriesAtEachSize(
+            12,
+            self.tracker_action(
+                "save", pokemon_name="Glumanda", nickname="Flamme", status="gefangen"
+            ),
+        )
+
+    def test_tracker_reset(self):
+        self.assertQueriesAtEachSize(2, self.tracker_action("reset"))
+
+    def test_tracker_route_actions(self):
+        for action, num in [
+            ("kill_route", 3),
+            ("fail_route", 3),
+            ("reset_route", 4),
+            ("delete_route", 7),
+        ]:
+            with self.subTest(action=action):
+                self.assertQueriesAtEachSize(num, self.tracker_action(action))
+
+    def test_tracker_add_route(self):
+        self.assertQueriesAtEachSize(
+            12, self.tracker_action("add_route", route_name="Neue Route")
+        )
+
+    def test_tracker_reset_run(self):
+        self.assertQueriesAtEachSize(7, self.tracker_action("reset_run"))
+
+    def test_tracker_import_run(self):
+        def import_data():
+            return json.dumps(
+                {
+                    "encounters": [
+                        {
+                            "player_name": player.name,
+                            "route_name": "Route 1",
+                            "pokemon_name": "Schiggy",
+                            "status": "gefangen",
+                        }
+                        for player in self.players
+                    ],
+                    "player_types": [],
+                }
+            )
+
+        self.assertQueriesAtEachSize(
+            6, self.tracker_action("import_run", import_data=import_data)
+        )
+
+    def player_types_action(self, action, **data):
+        return self.post("player_types_view", {"action": action, **data})
+
+    def test_assign_type(self):
+        # The player lookup, then the player lock, the type lock and the upsert
+        # inside a savepoint.
+        self.assertQueriesAtEachSize(
+            6,
+            self.player_types_action(
+                "assign_type",
+                player_id=lambda: self.players[2].id,
+                type_name="Feuer",
+            ),
+            registry_loaded=True,
+        )
+
+    def test_remove_type(self):
+        self.assertQueriesAtEachSize(
+            2,
+            self.player_types_action(
+                "remove_type",
+                assignment_id=lambda: PlayerType.objects.get(type_name="Feuer").id,
+            ),
+        )
+
+    def test_distribute_types(self):
+        self.assertQueriesAtEachSize(
+            5, self.player_types_action("distribute_all", seed=1), registry_loaded=True
+        )
+
+    def test_reset_all_types(self):
+        self.assertQueriesAtEachSize(2, self.player_types_action("reset_all_types"))
+
+
+class StubPokeAPIHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open, so the client's pool can reuse them.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            script = server.responses.get(self.path, [{"status": 404}])
+            response = script.pop(0) if len(script) > 1 else script[0]
+            server.requests.append(
+                {
+                    "path": self.path,
+                    "if_none_match": self.headers.get("If-None-Match"),
+                    "port": self.client_address[1],
+                }
+            )
+
+        if response.get("delay"):
+            # Not time.sleep, which some tests patch.
+            threading.Event().wait(response["delay"])
+        if response.get("drop"):
+            # Close the socket without an answer.
+            self.close_connection = True
+            return
+
+        etag = response.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        else:
+            status = response.get("status", 200)
+            body = json.dumps(response.get("data", {})).encode("utf-8")
+        server.statuses.append(status)
+
+        try:
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except ConnectionError:
+            # The client timed out and went away.
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PokeAPIClientTests(SimpleTestCase):
+    # A real HTTP server on localhost, so timeouts, keep-alive and 304s go
+    # through requests and urllib3 like they do against the PokéAPI.
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPokeAPIHandler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/api/v2/"
+        thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        thread.start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        self.server.responses = {}
+        self.server.requests = []
+        self.server.statuses = []
+
+    def serve(self, path, *responses):
+        self.server.responses[f"/api/v2/{path}"] = list(responses)
+
+    def api_client(self, **kwargs):
+        client = PokeAPIClient(base_url=self.base_url, cache_dir=self.cache_dir, **kwargs)
+        self.addCleanup(client.session.close)
+        return client
+
+    def test_not_modified_reuses_cached_response(self):
+        self.serve("pokemon/25/", {"data": {"name": "pikachu"}, "etag": '"v1"'})
+        client = self.api_client()
+
+        self.assertEqual(client.get_json("pokemon/25/"), {"name": "pikachu"})
+        self.assertEqual(client.get_json("pokemon/25/"), {"name": "pikachu"})
+
+        self.assertEqual(
+            [request["if_none_match"] for request in self.server.requests],
+            [None, '"v1"'],
+        )
+        self.assertEqual(self.server.statuses, [200, 304])
+
+    def test_changed_response_replaces_cached_one(self):
+        self.serve(
+            "pokemon/25/",
+            {"data": {"name": "pikachu"}, "etag": '"v1"'},
+            {"data": {"name": "raichu"}, "etag": '"v2"'},
+        )
+        client = self.api_client()
+
+        client.get_json("pokemon/25/")
+        self.assertEqual(client.get_json("pokemon/25/"), {"name": "raichu"})
+        self.assertEqual(client.get_json("pokemon/25/"), {"name": "raichu"})
+        self.assertEqual(self.server.statuses, [200, 200, 304])
+        self.assertEqual(self.server.requests[-1]["if_none_match"], '"v2"')
+
+    def test_connections_are_reused(self):
+        for pokedex_id in range(1, 6):
+            self.serve(f"pokemon/{pokedex_id}/", {"data": {"id": pokedex_id}})
+        client = self.api_client()
+
+        for pokedex_id in range(1, 6):
+            self.assertEqual(client.get_json(f"pokemon/{pokedex_id}/"), {"id": pokedex_id})
+
+        self.assertEqual(len({request["port"] for request in self.server.requests}), 1)
+
+    @mock.patch("tracker.pokeapi.time.sleep")
+    def test_slow_responses_time_out(self, sleep):
+        self.serve("pokemon/25/", {"data": {"name": "pikachu"}, "delay": 0.5})
+        client = self.api_client(timeout=(1, 0.1), retries=2)
+
+        with self.assertRaises(requests.exceptions.Timeout):
+            client.get_json("pokemon/25/")
+
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(sleep.call_args_list, [mock.call(0.5), mock.call(1.0)])
+
+    @mock.patch("tracker.pokeapi.time.sleep")
+    def test_retries_server_errors_with_exponential_backoff(self, sleep):
+        self.serve(
+            "pokemon/25/",
+            {"status": 503},
+            {"status": 500},
+            {"data": {"name": "pikachu"}},
+        )
+        client = self.api_client(retries=3)
+
+        self.assertEqual(client.get_json("pokemon/25/"), {"name": "pikachu"})
+
+        self.assertEqual(self.server.statuses, [503, 500, 200])
+        self.assertEqual(sleep.call_args_list, [mock.call(0.5), mock.call(1.0)])
+        self.assertEqual(client.breaker.failures, 0)
+
+    def test_breaker_opens_on_socket_errors_and_lets_one_probe_through(self):
+        self.serve("pokemon/25/", {"data": {"name": "pikachu"}, "etag": '"v1"'})
+        self.serve(
+            "pokemon/1/",
+            {"drop": True},
+            {"drop": True},
+            {"drop": True},
+            {"data": {"name": "bulbasaur"}},
+        )
+        self.serve("pokemon/2/", {"data": {"name": "ivysaur"}})
+        client = self.api_client(
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+        )
+        client.get_json("pokemon/25/")
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.get_json("pokemon/1/")
+
+        # Open: no requests, cached responses are still served.
+        self.assertEqual(client.get_json("pokemon/25/"), {"name": "pikachu"})
+        with self.assertRaises(CircuitOpenError):
+            client.get_json("pokemon/1/")
+        self.assertEqual(len(self.server.requests), 3)
+
+        # Half-open after reset_timeout: one probe, and its failure reopens.
+        time.sleep(0.25)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.get_json("pokemon/1/")
+        with self.assertRaises(CircuitOpenError):
+            client.get_json("pokemon/1/")
+        self.assertEqual(len(self.server.requests), 4)
+
+        # A successful probe closes the breaker again.
+        time.sleep(0.25)
+        self.assertEqual(client.get_json("pokemon/1/"), {"name": "bulbasaur"})
+        self.assertEqual(client.get_json("pokemon/2/"), {"name": "ivysaur"})
+        self.assertIsNone(client.breaker.opened_at)
+
+    def test_refused_connections_open_the_breaker(self):
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            port = closed.getsockname()[1]
+        client = PokeAPIClient(
+            base_url=f"http://127.0.0.1:{port}/api/v2/",
+            breaker=CircuitBreaker(failure_threshold=2),
+        )
+
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.get_json("pokemon/25/")
+        with self.assertRaises(CircuitOpenError):
+            client.get_json("pokemon/25/")
+
+    def test_shared_client_uses_configured_base_url(self):
+        self.serve("pokemon/25/", {"data": {"name": "pikachu"}})
+
+        with override_settings(
+            POKEAPI_BASE_URL=self.base_url, POKEAPI_CACHE_DIR=self.cache_dir
+        ), mock.patch.object(pokeapi, "_client", None):
+            self.assertEqual(pokeapi.get_json("pokemon/25/"), {"name": "pikachu"})
+            pokeapi.get_client().session.close()
+
+        self.assertEqual(self.server.requests[0]["path"], "/api/v2/pokemon/25/")
+
+
+class BundleTests(TrackerTestCase):
+    def test_type_registry_is_invalidated_after_commit(self):
+        version = cache.get(type_registry.REGISTRY_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_types()
+            self.assertEqual(cache.get(type_registry.REGISTRY_VERSION_KEY), version)
+        self.assertNotEqual(cache.get(type_registry.REGISTRY_VERSION_KEY), version)
+
+    def test_species_caches_are_invalidated_after_commit(self):
+        version = cache.get(autocomplete.INDEX_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            store_species([{"pokedex_id": 25, "name": "Pikachu", "type1": "electric"}])
+            self.assertEqual(cache.get(autocomplete.INDEX_VERSION_KEY), version)
+        self.assertNotEqual(cache.get(autocomplete.INDEX_VERSION_KEY), version)
+
+    def test_bundled_sprites_are_served_as_static_files(self):
+        sprite_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(sprite_dir.cleanup)
+        bundle = {
+            "types": [],
+            "species": [
+                {
+                    "pokedex_id": 25,
+                    "name": "Pikachu",
+                    "type1": "electric",
+                    "sprite_url": "https://example.com/25.png",
+                    "sprite": base64.b64encode(b"\x89PNG sprite").decode("ascii"),
+                }
+            ],
+        }
+        load_bundle(bundle, sprite_dir=sprite_dir.name)
+
+        self.assertEqual(
+            Path(sprite_dir.name, "25.png").read_bytes(), b"\x89PNG sprite"
+        )
+        self.assertEqual(
+            sprites.sprite_url(25, Path(sprite_dir.name)),
+            "/static/tracker/sprites/25.png",
+        )
+        self.assertIsNone(sprites.sprite_url(1, Path(sprite_dir.name)))
+
+
+@skipUnless(find_spec("PIL"), "Pillow is not installed")
+@override_settings(STORAGES=TEST_STORAGES)
+class SpriteSheetTests(SimpleTestCase):
+    def setUp(self):
+        sprite_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(sprite_dir.cleanup)
+        self.sprite_dir = Path(sprite_dir.name)
+
+    def sprite(self, color):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGBA", (8, 8), color).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def pack(self, color):
+        return sprites.pack_sprite_sheets({25: self.sprite(color)}, self.sprite_dir)
+
+    def generation_files(self, manifest):
+        return sprites.generation_files(manifest)
+
+    def test_single_sprites_are_stored_apart_from_the_sheet(self):
+        from PIL import Image
+
+        manifest = self.pack("red")
+
+        name = manifest["sprites"][25]
+        self.assertRegex(name, r"^sprite-25\.[0-9a-f]{12}\.png$")
+        self.assertEqual(Image.open(self.sprite_dir / name).size, (8, 8))
+        self.assertEqual(
+            sprites.sprite_url(25, self.sprite_dir), f"/static/tracker/sprites/{name}"
+        )
+
+    def test_collected_sprites_get_hashed_static_urls(self):
+        manifest = self.pack("red")
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+
+        with override_settings(
+            STATIC_ROOT=static_root.name,
+            STATICFILES_DIRS=[("tracker/sprites", str(self.sprite_dir))],
+            STORAGES={
+                **TEST_STORAGES,
+                "staticfiles": {
+                    "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+                },
+            },
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            url = sprites.sprite_url(25, self.sprite_dir)
+            css_url = static(f"tracker/sprites/{manifest['css']}")
+
+        stem = manifest["sprites"][25].removesuffix(".png")
+        self.assertRegex(url, rf"^/static/tracker/sprites/{stem}\.[0-9a-f]{{12}}\.png$")
+        self.assertNotEqual(css_url, f"/static/tracker/sprites/{manifest['css']}")
+
+    def test_previous_generation_stays_on_disk(self):
+        first = self.pack("red")
+        first_version = sprites.manifest_version(self.sprite_dir)
+        second = self.pack("green")
+        self.assertNotEqual(sprites.manifest_version(self.sprite_dir), first_version)
+
+        files = {path.name for path in self.sprite_dir.iterdir()}
+        self.assertLessEqual(self.generation_files(first) | self.generation_files(second), files)
+
+        third = self.pack("blue")
+        files = {path.name for path in self.sprite_dir.iterdir()}
+        self.assertLessEqual(self.generation_files(second) | self.generation_files(third), files)
+        self.assertFalse(self.generation_files(first) & files)
+        self.assertEqual(sprites.load_manifest(self.sprite_dir)["css"], third["css"])
+
+
+class BatchSaveTests(TrackerTestCase):
+    def test_invalid_values_fail_only_their_cell(self):
+        create_types()
+        create_species()
+        players, route_ids = create_run(1, 4)
+        player_id = players[0].id
+        updates = [
+            {"player": player_id, "route": route_ids[0], "pokemon_name": ["Glumanda"]},
+            {"player": player_id, "route": route_ids[1], "nickname": {"name": "Flamme"}},
+            {"player": player_id, "route": route_ids[2], "status": ["gefangen"]},
+            {
+                "player": player_id,
+                "route": route_ids[3],
+                "pokemon_name": "Schiggy",
+                "status": "gefangen",
+            },
+        ]
+
+        response = self.client.post(
+            reverse("save_encounters_view"),
+            json.dumps({"updates": updates}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(
+            [list(result.get("errors", {})) for result in results],
+            [["pokemon_name"], ["nickname"], ["status"], []],
+        )
+        self.assertEqual(
+            Encounter.objects.get(player_id=player_id, route_id=route_ids[3]).status,
+            "gefangen",
+        )
+
+
+class BatchDupeTests(TrackerTestCase):
+    def save(self, updates):
+        response = self.client.post(
+            reverse("save_encounters_view"),
+            json.dumps({"updates": updates}),
+            content_type="application/json",
+        )
+        return [result["dupe"] for result in response.json()["results"]]
+
+    def catch(self, player_id, route_id, pokemon_name):
+        return {
+            "player": player_id,
+            "route": route_id,
+            "pokemon_name": pokemon_name,
+            "status": "gefangen",
+        }
+
+    def test_same_family_twice_in_one_batch_is_a_dupe(self):
+        create_species()
+        players, route_ids = create_run(2, 3)
+        first, second = players[0].id, players[1].id
+
+        dupes = self.save(
+            [
+                self.catch(first, route_ids[0], "Glumanda"),
+                self.catch(first, route_ids[1], "Glurak"),
+                self.catch(first, route_ids[2], "Schiggy"),
+                self.catch(second, route_ids[0], "Glumanda"),
+            ]
+        )
+
+        self.assertEqual(dupes, [True, True, False, False])
+
+    def test_cells_in_the_batch_replace_saved_catches(self):
+        create_species()
+        players, route_ids = create_run(1, 2)
+        player_id = players[0].id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.save([self.catch(player_id, route_ids[0], "Glumanda")])
+
+        dupes = self.save(
+            [
+                self.catch(player_id, route_ids[0], "Schiggy"),
+                self.catch(player_id, route_ids[1], "Glurak"),
+            ]
+        )
+
+        self.assertEqual(dupes, [False, False])
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": cache_dir.name,
+                }
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_one_caller_computes_a_missing_file_cache_entry(self):
+        threads_count = 8
+        barrier = threading.Barrier(threads_count)
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "Wert"
+
+        def get():
+            barrier.wait()
+            results.append(caching.get_or_set("single-flight", compute, timeout=60))
+
+        threads = [threading.Thread(target=get) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["Wert"] * threads_count)
+
+    def test_waiters_compute_locally_after_the_capped_wait(self):
+        self.assertTrue(caching.acquire("held"))
+        self.assertFalse(caching.acquire("held"))
+
+        started = time.monotonic()
+        with mock.patch.object(caching, "LOCK_WAIT", 0.1):
+            value = caching.get_or_set("held", lambda: "lokal", timeout=60)
+
+        self.assertEqual(value, "lokal")
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_lock_left_by_a_dead_process_expires(self):
+        self.assertTrue(caching.acquire("verwaist"))
+        path = caching.lock_path(caching.get_cache(), "verwaist")
+        expired = time.time() - caching.LOCK_TIMEOUT - 1
+        os.utime(path, (expired, expired))
+
+        self.assertTrue(caching.acquire("verwaist"))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConcurrentAssignTests(TransactionTestCase):
+    THREADS = 8
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            # Shared in-memory SQLite locks tables and fails concurrent writers
+            # instead of waiting; a file database waits like PostgreSQL.
+            self.skipTest("needs PostgreSQL or a file-based SQLite test database")
+
+    def run_concurrently(self, assignments):
+        barrier = threading.Barrier(len(assignments))
+        errors = []
+
+        def assign(player_id, type_names):
+            try:
+                barrier.wait()
+                for type_name in type_names:
+                    with transaction.atomic():
+                        PlayerType.objects.assign(player_id, type_name)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=assign, args=args) for args in assignments]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_concurrent_assignments_keep_one_row_per_type(self):
+        player_ids = [
+            Player.objects.create(name=f"Spieler {i}").id for i in range(self.THREADS)
+        ]
+
+        self.run_concurrently(
+            [(player_id, ["Feuer", "Wasser", "Pflanze"]) for player_id in player_ids]
+        )
+
+        counts = dict(
+            PlayerType.objects.values("type_name")
+            .annotate(count=Count("id"))
+            .values_list("type_name", "count")
+        )
+        self.assertEqual(counts, {"Feuer": 1, "Wasser": 1, "Pflanze": 1})
+
+    def test_concurrent_assignments_to_one_player_get_distinct_orders(self):
+        player_id = Player.objects.create(name="Spieler").id
+        type_names = [f"Typ {i}" for i in range(self.THREADS * 2)]
+
+        self.run_concurrently(
+            [(player_id, type_names[i :: self.THREADS]) for i in range(self.THREADS)]
+        )
+
+        orders = sorted(
+            PlayerType.objects.filter(player_id=player_id).values_list("order", flat=True)
+        )
+        self.assertEqual(orders, list(range(len(type_names))))
+
+
+class SingleSaveTests(TrackerTestCase):
+    def save(self, player_id, route_id, **fields):
+        return self.client.post(
+            reverse("tracker_view"),
+            {"action": "save", "player": player_id, "route": route_id, **fields},
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+
+    def test_rejected_catch_is_not_reported_as_missing_pokemon(self):
+        create_types()
+        create_species()
+        players, route_ids = create_run(1, 1)
+        PlayerType.objects.create(player=players[0], type_name="Feuer")
+
+        # A nickname on an open cell counts as a catch.
+        response = self.save(
+            players[0].id, route_ids[0], pokemon_name="Schiggy", nickname="Blubb", status="-"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"]["pokemon_name"][0]["code"], "illegal"
+        )
+
+
+class TypeChartTests(TrackerTestCase):
+    def test_effectiveness_for_dual_types(self):
+        create_types()
+        multipliers = effectiveness_for("fire", "flying")
+        self.assertEqual(multipliers["rock"], 4.0)
+        self.assertEqual(multipliers["ground"], 0.0)
+        self.assertEqual(multipliers["grass"], 0.25)
+
+    def test_batch_matches_single_lookups(self):
+        create_types()
+        pairs = [("fire", "flying"), ("water", None), ("grass", "poison")]
+        batch = grouped_effectiveness_batch(pairs)
+        self.assertEqual(batch, [grouped_effectiveness(*pair) for pair in pairs])
+        self.assertEqual(batch[0]["effectiveness"]["4"], ["Gestein"])
+
+
+class SpeciesRenameTests(TrackerTestCase):
+    def test_cached_rows_show_renamed_species(self):
+        create_types()
+        create_species()
+        players, route_ids = create_run(1, 1)
+        Encounter.objects.filter(player=players[0]).update(
+            pokemon_species=PokemonSpecies.objects.get(pokedex_id=25), status="gefangen"
+        )
+        self.client.get(reverse("tracker_view"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            store_species([{"pokedex_id": 25, "name": "Pikachu-Neu", "type1": "electric"}])
+
+        self.assertContains(self.client.get(reverse("tracker_view")), "Pikachu-Neu")
@@ -0,0 +1,119 @@
+import json
+import threading
+import uuid
+from pathlib import Path
+from types import MappingProxyType
+
+from django.core.cache import cache
+from django.db import DatabaseError
+
+from . import caching
+from .models import PokemonType
+
+REGISTRY_VERSION_KEY = "type_registry_version"
+TYPE_NAMES_CACHE_KEY = "german_type_names_{}"
+TYPE_NAMES_TIMEOUT = 60 * 60 * 24
+BUNDLED_TYPE_CHART = Path(__file__).resolve().parent / "data" / "type_chart.json"
+
+DEFAULT_TYPE_COLOR = "#68A090"
+
+TYPE_COLORS_EN = {
+    "normal": "#A8A77A",
+    "fire": "#EE8130",
+    "water": "#6390F0",
+    "electric": "#F7D02C",
+    "grass": "#7AC74C",
+    "ice": "#96D9D6",
+    "fighting": "#C22E28",
+    "poison": "#A33EA1",
+    "ground": "#E2BF65",
+    "flying": "#A98FF3",
+    "psychic": "#F95587",
+    "bug": "#A6B91A",
+    "rock": "#B6A136",
+    "ghost": "#735797",
+    "dragon": "#6F35FC",
+    "dark": "#705746",
+    "steel": "#B7B7CE",
+    "fairy": "#D685AD",
+    "unknown": "#68A090",
+    "shadow": "#605A55",
+    "stellar": "#44A0DA",
+}
+
+EXCLUDED_TYPES = ["unknown", "shadow", "stellar"]
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+class TypeRegistry:
+    def __init__(self, german_names, version=None):
+        self.version = version
+        self.en_to_de = MappingProxyType(dict(german_names))
+        self.de_to_en = MappingProxyType({de: en for en, de in german_names.items()})
+        self.colors_en = MappingProxyType(
+            {en: TYPE_COLORS_EN.get(en, DEFAULT_TYPE_COLOR) for en in german_names}
+        )
+        self.colors_de = MappingProxyType(
+            {
+                de: TYPE_COLORS_EN.get(en, DEFAULT_TYPE_COLOR)
+                for en, de in german_names.items()
+            }
+        )
+
+    def german_name(self, english_name):
+        return self.en_to_de.get(english_name, english_name.capitalize())
+
+    def color_de(self, german_name):
+        return self.colors_de.get(german_name, DEFAULT_TYPE_COLOR)
+
+
+def load_german_names():
+    try:
+        german_names = dict(PokemonType.objects.values_list("name", "german_name"))
+    except DatabaseError:
+        german_names = {}
+
+    if not german_names:
+        with open(BUNDLED_TYPE_CHART, encoding="utf-8") as f:
+            german_names = {t["name"]: t["name_de"] for t in json.load(f)["types"]}
+
+    return {
+        en: de for en, de in german_names.items() if en not in EXCLUDED_TYPES
+    }
+
+
+def store_german_names():
+    # Replaces the shared entry even while it is still fresh, e.g. from warm_caches.
+    german_names = load_german_names()
+    caching.store(
+        TYPE_NAMES_CACHE_KEY.format(cache.get(REGISTRY_VERSION_KEY)),
+        german_names,
+        TYPE_NAMES_TIMEOUT,
+        TYPE_NAMES_TIMEOUT,
+    )
+    return german_names
+
+
+def get_type_registry():
+    global _registry
+
+    version = cache.get(REGISTRY_VERSION_KEY)
+    if _registry is not None and _registry.version == version:
+        return _registry
+
+    with _registry_lock:
+        if _registry is None or _registry.version != version:
+            german_names = caching.get_or_set(
+                TYPE_NAMES_CACHE_KEY.format(version),
+                load_german_names,
+                timeout=TYPE_NAMES_TIMEOUT,
+                stale_timeout=TYPE_NAMES_TIMEOUT,
+            )
+            _registry = TypeRegistry(german_names, version)
+    return _registry
+
+
+def invalidate():
+    cache.set(REGISTRY_VERSION_KEY, uuid.uuid4().hex, timeout=None)
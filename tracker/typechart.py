@@ -0,0 +1,228 @@
+import threading
+
+import numpy as np
+from django.db import transaction
+
+from . import type_registry
+from .models import PokemonType, TypeChart
+from .type_registry import EXCLUDED_TYPES, get_type_registry
+
+TYPE_ORDER = [
+    "normal",
+    "fire",
+    "water",
+    "electric",
+    "grass",
+    "ice",
+    "fighting",
+    "poison",
+    "ground",
+    "flying",
+    "psychic",
+    "bug",
+    "rock",
+    "ghost",
+    "dragon",
+    "dark",
+    "steel",
+    "fairy",
+]
+
+TYPE_INDEX = {name: index for index, name in enumerate(TYPE_ORDER)}
+
+# Index for "no second type" and for types outside the chart (e.g. "unknown").
+NO_TYPE = len(TYPE_ORDER)
+
+MULTIPLIER_KEYS = {4.0: "4", 2.0: "2", 1.0: "1", 0.5: "0.5", 0.25: "0.25", 0.0: "0"}
+
+
+def type_mask(type1, type2=None):
+    # One bit per TYPE_ORDER index; types outside the chart add no bit.
+    mask = 0
+    for type_name in (type1, type2):
+        if type_name in TYPE_INDEX:
+            mask |= 1 << TYPE_INDEX[type_name]
+    return mask
+
+
+_profiles = None
+_profiles_version = None
+_groups = {}
+_profiles_lock = threading.Lock()
+
+
+def build_profiles(chart):
+    # Extra neutral column NO_TYPE so missing second types use the same product.
+    defending = np.ones((len(TYPE_ORDER), NO_TYPE + 1))
+    defending[:, :NO_TYPE] = chart
+
+    # profiles[type1, type2, attacking] for every combination in one product.
+    profiles = (defending[:, :, None] * defending[:, None, :]).transpose(1, 2, 0)
+
+    # Single types (type1 == type2 or type2 missing) must not be squared.
+    diagonal = np.arange(NO_TYPE + 1)
+    profiles[diagonal, diagonal] = defending.T
+    return profiles
+
+
+def store_types(types):
+    # types: [{"name", "name_de", "double_damage_to", "half_damage_to", "no_damage_to"}]
+    type_names = [t["name"] for t in types]
+    chart_rows = []
+    for type_data in types:
+        multipliers = {}
+        for name in type_data["double_damage_to"]:
+            multipliers[name] = 2.0
+        for name in type_data["half_damage_to"]:
+            multipliers[name] = 0.5
+        for name in type_data["no_damage_to"]:
+            multipliers[name] = 0.0
+
+        for defending_type in type_names:
+            chart_rows.append(
+                TypeChart(
+                    attacking_type=type_data["name"],
+                    defending_type=defending_type,
+                    multiplier=multipliers.get(defending_type, 1.0),
+                )
+            )
+
+    with transaction.atomic():
+        PokemonType.objects.all().delete()
+        TypeChart.objects.all().delete()
+        PokemonType.objects.bulk_create(
+            PokemonType(name=t["name"], german_name=t["name_de"]) for t in types
+        )
+        TypeChart.objects.bulk_create(chart_rows)
+        transaction.on_commit(type_registry.invalidate)
+    return len(types), len(chart_rows)
+
+
+def dump_types():
+    relations = {2.0: "double_damage_to", 0.5: "half_damage_to", 0.0: "no_damage_to"}
+    types = {
+        name: {
+            "name": name,
+            "name_de": german_name,
+            "double_damage_to": [],
+            "half_damage_to": [],
+            "no_damage_to": [],
+        }
+        for name, german_name in PokemonType.objects.values_list("name", "german_name")
+    }
+    rows = TypeChart.objects.order_by("attacking_type", "defending_type").values_list(
+        "attacking_type", "defending_type", "multiplier"
+    )
+    for attacking_type, defending_type, multiplier in rows:
+        if attacking_type in types and multiplier in relations:
+            types[attacking_type][relations[multiplier]].append(defending_type)
+    return list(types.values())
+
+
+def load_chart():
+    chart = np.ones((len(TYPE_ORDER), len(TYPE_ORDER)))
+    rows = TypeChart.objects.values_list(
+        "attacking_type", "defending_type", "multiplier"
+    )
+    found = False
+    for attacking_type, defending_type, multiplier in rows:
+        if attacking_type in TYPE_INDEX and defending_type in TYPE_INDEX:
+            chart[TYPE_INDEX[attacking_type], TYPE_INDEX[defending_type]] = multiplier
+            found = True
+
+    if not found:
+        return None
+    return build_profiles(chart)
+
+
+def get_profiles():
+    global _profiles, _profiles_version, _groups
+
+    # populate_types bumps the registry version, which also reloads the chart.
+    version = get_type_registry().version
+    if _profiles is not None and _profiles_version == version:
+        return _profiles
+
+    with _profiles_lock:
+        if _profiles is None or _profiles_version != version:
+            _profiles = load_chart()
+            _profiles_version = version
+            _groups = {}
+    return _profiles
+
+
+def type_index(type_name):
+    return TYPE_INDEX.get(type_name, NO_TYPE)
+
+
+def effectiveness_for(type1, type2=None):
+    profiles = get_profiles()
+    if profiles is None:
+        return None
+
+    multipliers = profiles[type_index(type1), type_index(type2)]
+    return dict(zip(TYPE_ORDER, multipliers.tolist()))
+
+
+def effectiveness_batch(list_of_pairs):
+    profiles = get_profiles()
+    if profiles is None:
+        return None
+
+    indices = np.array(
+        [(type_index(type1), type_index(type2)) for type1, type2 in list_of_pairs],
+        dtype=np.intp,
+    ).reshape(-1, 2)
+    return profiles[indices[:, 0], indices[:, 1]]
+
+
+def group_effectiveness(type1, type2, multipliers):
+    # multipliers: {attacking type: multiplier}; types outside the chart hit for 1.
+    german_type_map = get_type_registry().en_to_de
+    effectiveness = {value: [] for value in MULTIPLIER_KEYS.values()}
+    for attack_type_en, attack_type_de in german_type_map.items():
+        multiplier = float(multipliers.get(attack_type_en, 1.0))
+        if multiplier in MULTIPLIER_KEYS:
+            effectiveness[MULTIPLIER_KEYS[multiplier]].append(attack_type_de)
+    for names in effectiveness.values():
+        names.sort()
+
+    return {
+        "pokemon_types": [
+            german_type_map.get(t, t.capitalize())
+            for t in (type1, type2)
+            if t and t not in EXCLUDED_TYPES
+        ],
+        "effectiveness": effectiveness,
+    }
+
+
+def grouped_effectiveness(type1, type2=None):
+    # get_profiles() drops the grouped results when the chart is reloaded.
+    if get_profiles() is None:
+        return None
+    groups = _groups.get((type1, type2))
+    if groups is not None:
+        return groups
+
+    multipliers = effectiveness_for(type1, type2)
+    if multipliers is None:
+        return None
+    groups = group_effectiveness(type1, type2, multipliers)
+    _groups[(type1, type2)] = groups
+    return groups
+
+
+def grouped_effectiveness_batch(list_of_pairs):
+    # One lookup in the profile table for all pairs, e.g. every species.
+    list_of_pairs = list(list_of_pairs)
+    rows = effectiveness_batch(list_of_pairs)
+    if rows is None:
+        return None
+
+    groups = []
+    for (type1, type2), row in zip(list_of_pairs, rows.tolist()):
+        group = group_effectiveness(type1, type2, dict(zip(TYPE_ORDER, row)))
+        _groups[(type1, type2)] = group
+        groups.append(group)
+    return groups
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path("", views.tracker_view, name="tracker_view"),
+    path("export/", views.export_run_view, name="export_run_view"),
     path("bosse/", views.boss_view, name="boss_view"),
     path(
         "schwaechen/",
@@ -18,4 +19,10 @@ urlpatterns = [
         views.pokemon_autocomplete,
         name="pokemon_autocomplete",
     ),
+    path(
+        "api/encounters/",
+        views.save_encounters_view,
+        name="save_encounters_view",
+    ),
+    path("api/events/", views.event_stream, name="event_stream"),
 ]
@@ -1,243 +1,69 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponseNotAllowed, HttpResponse
-from django.views.decorators.http import require_POST
-from django.db.models import Q, Min, Max
-import requests
-from django.core.cache import cache
+from django.http import (
+    JsonResponse,
+    HttpResponseNotAllowed,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.db.models import Count, Q, Min
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
 import json
 from django.db import IntegrityError
 
 
-from .models import Player, Route, Encounter, PokemonSpecies, PlayerType
+from .models import (
+    Player,
+    Route,
+    Encounter,
+    PokemonSpecies,
+    PlayerType,
+)
+from . import events, legality, sprites
 from .forms import EncounterForm
-
-
-TYPE_NAMES_CACHE_KEY = "german_type_names_map"
-TYPE_EFFECTIVENESS_CACHE_KEY = "pokemon_type_effectiveness_{}"
-
-TYPE_COLORS_EN = {
-    "normal": "#A8A77A",
-    "fire": "#EE8130",
-    "water": "#6390F0",
-    "electric": "#F7D02C",
-    "grass": "#7AC74C",
-    "ice": "#96D9D6",
-    "fighting": "#C22E28",
-    "poison": "#A33EA1",
-    "ground": "#E2BF65",
-    "flying": "#A98FF3",
-    "psychic": "#F95587",
-    "bug": "#A6B91A",
-    "rock": "#B6A136",
-    "ghost": "#735797",
-    "dragon": "#6F35FC",
-    "dark": "#705746",
-    "steel": "#B7B7CE",
-    "fairy": "#D685AD",
-    "unknown": "#68A090",
-    "shadow": "#605A55",
-    "stellar": "#44A0DA",
+from .autocomplete import search_species
+from .distribution import distribute_types
+from .encounters import MAX_BATCH_SIZE, parse_id, save_encounters
+from .grid import build_tracker_grid, bump_grid, bump_route_rows, render_route_row
+from .exporter import async_chunks, gzip_stream, stream_json, stream_ndjson
+from .importer import import_run, parse_import_file, split_import_data
+from .type_registry import get_type_registry
+from .typechart import grouped_effectiveness
+
+
+AUTOCOMPLETE_MAX_AGE = 60 * 60
+FLAG_VALUES = {
+    "": False,
+    "0": False,
+    "false": False,
+    "no": False,
+    "off": False,
+    "1": True,
+    "true": True,
+    "yes": True,
+    "on": True,
 }
 
-EXCLUDED_TYPES = ["unknown", "shadow", "stellar"]
-
-
-def get_german_type_names():
-    german_names_map = cache.get(TYPE_NAMES_CACHE_KEY)
-    if german_names_map:
-        return german_names_map
-
-    german_names_map = {}
-    all_types_results = []
-    try:
-        all_types_response = requests.get("https://pokeapi.co/api/v2/type?limit=100")
-        all_types_response.raise_for_status()
-        all_types_results = all_types_response.json()["results"]
-
-        for type_info in all_types_results:
-            english_name = type_info["name"]
-            if english_name in EXCLUDED_TYPES:
-                continue
-
-            type_url = type_info["url"]
-            type_detail_response = requests.get(type_url)
-            type_detail_response.raise_for_status()
-            type_details = type_detail_response.json()
-
-            german_name = english_name.capitalize()
-            for name_data in type_details.get("names", []):
-                if name_data["language"]["name"] == "de":
-                    german_name = name_data["name"]
-                    break
-            german_names_map[english_name] = german_name
-
-        cache.set(TYPE_NAMES_CACHE_KEY, german_names_map, timeout=60 * 60 * 24)
-        return german_names_map
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching German type names from PokéAPI: {e}")
-        return {
-            t["name"]: t["name"].capitalize()
-            for t in all_types_results
-            if t["name"] not in EXCLUDED_TYPES
-        }
-    except Exception as e:
-        print(f"Unexpected error in get_german_type_names: {e}")
-        return {}
-
-
-def get_pokemon_types(pokemon_name_or_id):
-    try:
-        response = requests.get(
-            f"https://pokeapi.co/api/v2/pokemon/{pokemon_name_or_id.lower()}"
-        )
-        response.raise_for_status()
-        data = response.json()
-        types = [t["type"]["name"] for t in data["types"]]
-        return types
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching from PokéAPI: {e}")
-        return None
-
-
-def get_type_effectiveness(pokemon_id):
-    cache_key = TYPE_EFFECTIVENESS_CACHE_KEY.format(pokemon_id)
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        return cached_data
-
-    try:
-        german_type_map = get_german_type_names()
-        if not german_type_map:
-            print("Error: German type map is empty.")
-            return None
-
-        poke_response = requests.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}")
-        poke_response.raise_for_status()
-        poke_data = poke_response.json()
-        type_urls = [t["type"]["url"] for t in poke_data["types"]]
-        pokemon_types_en = [t["type"]["name"] for t in poke_data["types"]]
-        pokemon_types_de = [
-            german_type_map.get(t, t.capitalize())
-            for t in pokemon_types_en
-            if t not in EXCLUDED_TYPES
-        ]
-
-        damage_relations_list = []
-        for type_url in type_urls:
-            type_response = requests.get(type_url)
-            type_response.raise_for_status()
-            damage_relations_list.append(type_response.json()["damage_relations"])
-
-        all_attacking_types_en = list(german_type_map.keys())
-
-        effectiveness_by_multiplier = {
-            "4": [],
-            "2": [],
-            "1": [],
-            "0.5": [],
-            "0.25": [],
-            "0": [],
-        }
-
-        for attack_type_en in all_attacking_types_en:
-            multiplier = 1.0
-            for relations in damage_relations_list:
-                current_multiplier = 1.0
-                if any(
-                    t["name"] == attack_type_en for t in relations["double_damage_from"]
-                ):
-                    current_multiplier = 2.0
-                elif any(
-                    t["name"] == attack_type_en for t in relations["half_damage_from"]
-                ):
-                    current_multiplier = 0.5
-                elif any(
-                    t["name"] == attack_type_en for t in relations["no_damage_from"]
-                ):
-                    current_multiplier = 0.0
-                multiplier *= current_multiplier
-
-            attack_type_de = german_type_map.get(attack_type_en)
-            if not attack_type_de:
-                print(
-                    f"Warning: English type '{attack_type_en}' not found in german_type_map during effectiveness calculation."
-                )
-                continue
-
-            if multiplier == 4.0:
-                effectiveness_by_multiplier["4"].append(attack_type_de)
-            elif multiplier == 2.0:
-                effectiveness_by_multiplier["2"].append(attack_type_de)
-            elif multiplier == 1.0:
-                effectiveness_by_multiplier["1"].append(attack_type_de)
-            elif multiplier == 0.5:
-                effectiveness_by_multiplier["0.5"].append(attack_type_de)
-            elif multiplier == 0.25:
-                effectiveness_by_multiplier["0.25"].append(attack_type_de)
-            elif multiplier == 0.0:
-                effectiveness_by_multiplier["0"].append(attack_type_de)
-
-        for key in effectiveness_by_multiplier:
-            effectiveness_by_multiplier[key].sort()
-
-        result = {
-            "pokemon_types": pokemon_types_de,
-            "effectiveness": effectiveness_by_multiplier,
-        }
-
-        cache.set(cache_key, result, timeout=60 * 60 * 24 * 7)
-        return result
 
-    except requests.exceptions.RequestException as e:
-        print(
-            f"Error fetching type effectiveness from PokéAPI for ID {pokemon_id}: {e}"
-        )
-        return None
-    except Exception as e:
-        print(
-            f"An unexpected error occurred in get_type_effectiveness for ID {pokemon_id}: {e}"
-        )
-        return None
+def get_type_effectiveness(species):
+    pokemon_info = grouped_effectiveness(species.type1, species.type2)
+    if pokemon_info is None:
+        print("Error: Type chart is empty. Run 'python manage.py populate_types'.")
+    return pokemon_info
 
 
+@ensure_csrf_cookie
 def tracker_view(request):
     if request.method == "GET":
-        players = Player.objects.all()
-        routes = Route.objects.all().order_by("order", "name")
-        encounters = Encounter.objects.select_related(
-            "player", "route", "pokemon_species"
-        ).all()
-        encounter_map = {
-            route: {player: None for player in players} for route in routes
-        }
-        for encounter in encounters:
-            if (
-                encounter.route in encounter_map
-                and encounter.player in encounter_map[encounter.route]
-            ):
-                encounter_map[encounter.route][encounter.player] = encounter
-        
-        player_types = PlayerType.objects.select_related("player").order_by(
-            "player__name", "order"
-        )
-        
-        german_type_map = get_german_type_names()
-        all_type_colors_de = {}
-        if german_type_map:
-            for en_name, de_name in german_type_map.items():
-                color = TYPE_COLORS_EN.get(en_name, "#68A090")
-                all_type_colors_de[de_name] = color
-        
-        encounter_form = EncounterForm()
+        type_colors_de = get_type_registry().colors_de
         context = {
-            "players": players,
-            "routes": routes,
-            "encounter_map": encounter_map,
-            "encounter_form": encounter_form,
-            "player_types": player_types,
-            "all_type_colors_de": all_type_colors_de,
+            "grid": build_tracker_grid(type_colors_de),
+            "all_type_colors_de": dict(type_colors_de),
+            "status_choices": Encounter.STATUS_CHOICES,
             "active_tab": "tracker",
         }
         return render(request, "tracker/tracker.html", context)
@@ -263,19 +89,33 @@ def tracker_view(request):
                 min_order = Route.objects.aggregate(Min("order"))["order__min"]
                 new_order = (min_order - 1) if min_order is not None else 0
 
-                new_route = Route.objects.create(name=route_name, order=new_order)
+                with transaction.atomic():
+                    route_ids, created = Route.objects.upsert_routes(
+                        [(route_name, new_order)], update_order=False
+                    )
+                if not created:
+                    return JsonResponse(
+                        {
+                            "status": "error",
+                            "message": f'Route "{route_name}" existiert bereits.',
+                        },
+                        status=400,
+                    )
 
-                players = Player.objects.all()
-                for player in players:
-                    Encounter.objects.create(player=player, route=new_route, status="-")
+                new_route_id = route_ids[route_name]
+                row_html, before_route_id = render_route_row(new_route_id)
+                if events.has_subscribers():
+                    events.publish_route_added(new_route_id, row_html, before_route_id)
 
                 return JsonResponse(
                     {
                         "status": "success",
                         "message": f'Route "{route_name}" hinzugefügt.',
-                        "route_id": new_route.id,
-                        "route_name": new_route.name,
-                        "route_order": new_route.order,
+                        "route_id": new_route_id,
+                        "route_name": route_name,
+                        "route_order": new_order,
+                        "html": row_html,
+                        "before_route_id": before_route_id,
                     }
                 )
             except IntegrityError:
@@ -307,6 +147,8 @@ def tracker_view(request):
                         order__lt=-1
                     ).delete()
                     deleted_types_count, _ = PlayerType.objects.all().delete()
+                    transaction.on_commit(bump_grid)
+                    transaction.on_commit(events.publish_reload)
 
                     return JsonResponse(
                         {
@@ -324,171 +166,58 @@ def tracker_view(request):
                     status=500,
                 )
 
-        elif action == "export_run":
-            if not is_ajax:
-                return HttpResponseNotAllowed(["POST"])
-
-            try:
-                encounters = Encounter.objects.select_related(
-                    "player", "route", "pokemon_species"
-                ).all()
-                player_types = PlayerType.objects.select_related("player").all()
-
-                export_data = {
-                    "encounters": [],
-                    "player_types": []
-                }
-                
-                for encounter in encounters:
-                    encounter_data = {
-                        "player_name": encounter.player.name,
-                        "route_name": encounter.route.name,
-                        "status": encounter.status,
-                        "nickname": encounter.nickname,
-                        "pokemon_name": encounter.pokemon_species.name
-                        if encounter.pokemon_species
-                        else None,
-                    }
-                    export_data["encounters"].append(encounter_data)
-
-                for player_type in player_types:
-                    type_data = {
-                        "player_name": player_type.player.name,
-                        "type_name": player_type.type_name,
-                        "order": player_type.order,
-                    }
-                    export_data["player_types"].append(type_data)
-
-                return JsonResponse({"status": "success", "data": export_data})
-            except Exception as e:
-                print(f"Error exporting run: {e}")
-                return JsonResponse(
-                    {
-                        "status": "error",
-                        "message": f"Fehler beim Exportieren des Runs: {str(e)}",
-                    },
-                    status=500,
-                )
-
         elif action == "import_run":
             if not is_ajax:
                 return HttpResponseNotAllowed(["POST"])
 
             try:
-                import_data = json.loads(request.POST.get("import_data", "{}"))
+                import_file = request.FILES.get("import_file")
+                if import_file:
+                    import_data = parse_import_file(import_file.read())
+                else:
+                    import_data = json.loads(request.POST.get("import_data", "{}"))
                 if not import_data:
                     return JsonResponse(
                         {"status": "error", "message": "Keine Daten zum Importieren."},
                         status=400,
                     )
 
-                encounters_data = import_data if isinstance(import_data, list) else import_data.get("encounters", [])
-                player_types_data = import_data.get("player_types", []) if isinstance(import_data, dict) else []
+                encounters_data, player_types_data = split_import_data(import_data)
 
                 with transaction.atomic():
-                    encounter_success_count = 0
-                    encounter_error_count = 0
-                    type_success_count = 0
-                    type_error_count = 0
-
-                    for item in encounters_data:
-                        try:
-                            player_name = item.get("player_name")
-                            route_name = item.get("route_name")
-                            pokemon_name = item.get("pokemon_name")
-
-                            if not player_name or not route_name:
-                                encounter_error_count += 1
-                                continue
-
-                            player, _ = Player.objects.get_or_create(name=player_name)
-
-                            try:
-                                route = Route.objects.get(name=route_name)
-                            except Route.DoesNotExist:
-                                encounter_error_count += 1
-                                continue
-
-                            pokemon_species = None
-                            if pokemon_name:
-                                try:
-                                    pokemon_species = PokemonSpecies.objects.get(
-                                        name__iexact=pokemon_name
-                                    )
-                                except PokemonSpecies.DoesNotExist:
-                                    pass
-
-                            import_status = item.get("status")
-                            if import_status == "verpasst":
-                                import_status = "-"
-                            elif not import_status:
-                                import_status = "-"
-
-                            encounter, created = Encounter.objects.update_or_create(
-                                player=player,
-                                route=route,
-                                defaults={
-                                    "pokemon_species": pokemon_species,
-                                    "nickname": item.get("nickname"),
-                                    "status": import_status,
-                                },
-                            )
-
-                            encounter_success_count += 1
-
-                        except Exception as e:
-                            print(f"Error importing encounter {item}: {e}")
-                            encounter_error_count += 1
-
-                    for item in player_types_data:
-                        try:
-                            player_name = item.get("player_name")
-                            type_name = item.get("type_name")
-                            order = item.get("order", 0)
-
-                            if not player_name or not type_name:
-                                type_error_count += 1
-                                continue
-
-                            player, _ = Player.objects.get_or_create(name=player_name)
-
-                            existing_assignment = PlayerType.objects.filter(type_name=type_name).first()
-                            if existing_assignment:
-                                existing_assignment.delete()
-
-                            PlayerType.objects.create(
-                                player=player,
-                                type_name=type_name,
-                                order=order
-                            )
-
-                            type_success_count += 1
+                    transaction.on_commit(bump_grid)
+                    transaction.on_commit(legality.invalidate)
+                    transaction.on_commit(legality.invalidate_families)
+                    transaction.on_commit(events.publish_reload)
+                    result = import_run(encounters_data, player_types_data)
+
+                encounter_error_count = sum(
+                    1 for error in result["errors"] if error["type"] == "encounter"
+                )
+                type_error_count = len(result["errors"]) - encounter_error_count
 
-                        except Exception as e:
-                            print(f"Error importing player type {item}: {e}")
-                            type_error_count += 1
+                message_parts = []
+                if result["encounter_count"] > 0 or encounter_error_count > 0:
+                    message_parts.append(f"{result['encounter_count']} Encounters erfolgreich importiert")
+                    if encounter_error_count > 0:
+                        message_parts.append(f"{encounter_error_count} Encounter-Fehler")
 
-                    message_parts = []
-                    if encounter_success_count > 0 or encounter_error_count > 0:
-                        message_parts.append(f"{encounter_success_count} Encounters erfolgreich importiert")
-                        if encounter_error_count > 0:
-                            message_parts.append(f"{encounter_error_count} Encounter-Fehler")
-                    
-                    if type_success_count > 0 or type_error_count > 0:
-                        message_parts.append(f"{type_success_count} Typenzuweisungen erfolgreich importiert")
-                        if type_error_count > 0:
-                            message_parts.append(f"{type_error_count} Typen-Fehler")
+                if result["type_count"] > 0 or type_error_count > 0:
+                    message_parts.append(f"{result['type_count']} Typenzuweisungen erfolgreich importiert")
+                    if type_error_count > 0:
+                        message_parts.append(f"{type_error_count} Typen-Fehler")
 
-                    return JsonResponse(
-                        {
-                            "status": "success",
-                            "message": ". ".join(message_parts) + ".",
-                        }
-                    )
+                return JsonResponse(
+                    {
+                        "status": "success",
+                        "message": ". ".join(message_parts) + ".",
+                        "errors": result["errors"],
+                    }
+                )
 
-            except json.JSONDecodeError:
+            except (json.JSONDecodeError, UnicodeDecodeError, OSError, EOFError):
                 return JsonResponse(
-                    {"status": "error", "message": "Ungültiges JSON-Format."},
+                    {"status": "error", "message": "Ungültiges Dateiformat."},
                     status=400,
                 )
 
@@ -534,6 +263,9 @@ def tracker_view(request):
                     updated_count = Encounter.objects.filter(
                         route_id=route_id, pokemon_species__isnull=False
                     ).update(status="tot")
+                    transaction.on_commit(lambda: bump_route_rows([route_id]))
+                    transaction.on_commit(legality.invalidate_families)
+                    transaction.on_commit(lambda: events.publish_route(route_id))
                 return JsonResponse(
                     {
                         "status": "success",
@@ -558,6 +290,9 @@ def tracker_view(request):
                     updated_count = Encounter.objects.filter(route_id=route_id).update(
                         status="verkackt", pokemon_species=None, nickname=""
                     )
+                    transaction.on_commit(lambda: bump_route_rows([route_id]))
+                    transaction.on_commit(legality.invalidate_families)
+                    transaction.on_commit(lambda: events.publish_route(route_id))
                 return JsonResponse(
                     {
                         "status": "success",
@@ -584,8 +319,10 @@ def tracker_view(request):
             try:
                 route_to_delete = get_object_or_404(Route, pk=route_id)
                 route_name = route_to_delete.name
+                route_to_delete_id = route_to_delete.pk
                 with transaction.atomic():
                     route_to_delete.delete()
+                events.publish_route_deleted(route_to_delete_id)
                 return JsonResponse(
                     {
                         "status": "success",
@@ -682,6 +419,13 @@ def tracker_view(request):
                             if saved_instance.pokemon_species
                             else "",
                             "status_value": saved_instance.status,
+                            "dupe": legality.is_dupe(
+                                saved_instance.player_id,
+                                saved_instance.route_id,
+                                saved_instance.pokemon_species.evolution_family_id,
+                            )
+                            if saved_instance.pokemon_species
+                            else False,
                         }
                         return JsonResponse(response_data)
                     else:
@@ -704,9 +448,11 @@ def tracker_view(request):
                         if hasattr(form.errors, "get_json_data")
                         else {"__all__": form.errors.as_text()}
                     )
-                    if "pokemon_name" in error_dict and form.cleaned_data.get(
-                        "status"
-                    ) in ["-", "verkackt"]:
+                    # Only a missing Pokémon is fine for these statuses; a
+                    # rejected catch must reach the user as is.
+                    if form.has_error(
+                        "pokemon_name", "not_found"
+                    ) and form.cleaned_data.get("status") in ["-", "verkackt"]:
                         error_dict["pokemon_name"] = [
                             {
                                 "message": "Pokémon nicht gefunden, aber Status ist OK.",
@@ -735,6 +481,76 @@ def tracker_view(request):
     return HttpResponseNotAllowed(["GET", "POST"])
 
 
+@require_POST
+def save_encounters_view(request):
+    try:
+        data = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse(
+            {"status": "error", "message": "Ungültiges Datenformat."}, status=400
+        )
+
+    updates = data.get("updates") if isinstance(data, dict) else None
+    if not isinstance(updates, list) or not updates:
+        return JsonResponse(
+            {"status": "error", "message": "Keine Änderungen zum Speichern."},
+            status=400,
+        )
+    if len(updates) > MAX_BATCH_SIZE:
+        return JsonResponse(
+            {
+                "status": "error",
+                "message": f"Höchstens {MAX_BATCH_SIZE} Änderungen pro Anfrage.",
+            },
+            status=400,
+        )
+
+    try:
+        results = save_encounters(updates)
+    except Exception as e:
+        print(f"Error saving encounter batch: {e}")
+        return JsonResponse(
+            {"status": "error", "message": "Fehler beim Speichern."}, status=500
+        )
+
+    return JsonResponse({"status": "success", "results": results})
+
+
+@require_GET
+def export_run_view(request):
+    export_format = request.GET.get("format", "json")
+    if export_format == "ndjson":
+        chunks = stream_ndjson()
+        content_type = "application/x-ndjson"
+    elif export_format == "json":
+        chunks = stream_json()
+        content_type = "application/json"
+    else:
+        return JsonResponse(
+            {"status": "error", "message": f"Unbekanntes Format: {export_format}"},
+            status=400,
+        )
+
+    use_gzip = FLAG_VALUES.get(request.GET.get("gzip", "").strip().lower())
+    if use_gzip is None:
+        return JsonResponse(
+            {"status": "error", "message": "Ungültiger Wert für gzip."}, status=400
+        )
+
+    filename = f"nuzlocke_run_{timezone.localdate().isoformat()}.{export_format}"
+    if use_gzip:
+        chunks = gzip_stream(chunks)
+        content_type = "application/gzip"
+        filename += ".gz"
+
+    if isinstance(request, ASGIRequest):
+        chunks = async_chunks(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 def boss_view(request):
     boss_list = [
         {
@@ -926,29 +742,20 @@ def strength_weakness_view(request):
     pokemon_name_input = request.GET.get("pokemon_name", "").strip()
     pokemon_info = None
     display_name = pokemon_name_input
-    type_colors_de = {}
+    type_colors_de = get_type_registry().colors_de
     sprite_url = None
 
-    german_type_map = get_german_type_names()
-
-    if german_type_map:
-        for en_name, de_name in german_type_map.items():
-            color = TYPE_COLORS_EN.get(en_name, "#68A090")
-            type_colors_de[de_name] = color
-    else:
-        error = "Fehler beim Laden der deutschen Typennamen von der API."
-
     if pokemon_name_input and not error:
         try:
             species = PokemonSpecies.objects.get(name__iexact=pokemon_name_input)
             display_name = species.name.capitalize()
             pokedex_id = species.pokedex_id
-            sprite_url = species.sprite_url
+            sprite_url = sprites.sprite_url(pokedex_id) or species.sprite_url
 
-            pokemon_info = get_type_effectiveness(pokedex_id)
+            pokemon_info = get_type_effectiveness(species)
 
             if pokemon_info is None and not error:
-                error = f"Konnte Effektivitäten für {display_name} (ID: {pokedex_id}) nicht von PokéAPI abrufen."
+                error = f"Keine Typentabelle für {display_name} (ID: {pokedex_id}) vorhanden. Bitte 'python manage.py populate_types' ausführen."
 
         except PokemonSpecies.DoesNotExist:
             error = f"Pokémon '{pokemon_name_input}' nicht in der lokalen Datenbank gefunden. Stelle sicher, dass die Datenbank aktuell ist und der Name korrekt geschrieben wurde."
@@ -972,21 +779,32 @@ def strength_weakness_view(request):
 
 
 def status_summary_view(request):
-    players = Player.objects.all()
+    players = Player.objects.annotate(
+        alive_count=Count("encounters", filter=Q(encounters__status="gefangen")),
+        dead_count=Count("encounters", filter=Q(encounters__status="tot")),
+        failed_count=Count("encounters", filter=Q(encounters__status="verkackt")),
+        decided_count=Count("encounters", filter=~Q(encounters__status="-")),
+    ).order_by("name")
+    route_count = Route.objects.count()
+
     summary = {}
     for player in players:
-        summary[player] = {
-            "lebendig": Encounter.objects.filter(
-                player=player,
-                status="gefangen",
-            ).select_related("pokemon_species", "route"),
-            "tot": Encounter.objects.filter(player=player, status="tot").select_related(
-                "pokemon_species", "route"
-            ),
-        }
+        player.open_count = route_count - player.decided_count
+        summary[player.id] = {"player": player, "lebendig": [], "tot": []}
+
+    encounters = (
+        Encounter.objects.filter(status__in=["gefangen", "tot"])
+        .select_related("pokemon_species", "route")
+        .order_by("player_id", "route__order", "route__name")
+    )
+    for encounter in encounters:
+        if encounter.player_id not in summary:
+            continue
+        key = "lebendig" if encounter.status == "gefangen" else "tot"
+        summary[encounter.player_id][key].append(encounter)
 
     context = {
-        "summary": summary,
+        "summary": summary.values(),
         "active_tab": "tot_lebendig",
     }
     return render(request, "tracker/status_summary.html", context)
@@ -1013,16 +831,7 @@ def player_types_view(request):
                 )
             try:
                 player = get_object_or_404(Player, pk=player_id)
-                german_type_map = get_german_type_names()
-                if not german_type_map:
-                    return JsonResponse(
-                        {
-                            "status": "error",
-                            "message": "Fehler beim Laden der Typen-Informationen von der API.",
-                        },
-                        status=500,
-                    )
-
+                german_type_map = get_type_registry().en_to_de
                 if type_name not in german_type_map.values():
                     return JsonResponse(
                         {
@@ -1032,62 +841,36 @@ def player_types_view(request):
                         status=400,
                     )
 
-                existing_assignment = PlayerType.objects.filter(
-                    type_name=type_name
-                ).first()
-                if existing_assignment:
-                    if existing_assignment.player_id == int(player_id):
+                with transaction.atomic():
+                    assignment_id, old_player_id = PlayerType.objects.assign(
+                        player.id, type_name
+                    )
+                    if old_player_id == player.id:
                         return JsonResponse(
                             {
                                 "status": "success",
-                                "assignment_id": existing_assignment.id,
+                                "assignment_id": assignment_id,
                                 "message": "Typ war bereits zugewiesen.",
                             }
                         )
-                    else:
-                        old_player_id = existing_assignment.player_id
-                        existing_assignment.delete()
-
-                        max_order_dict = PlayerType.objects.filter(
-                            player=player
-                        ).aggregate(Max("order"))
-                        new_order = (
-                            (max_order_dict["order__max"] + 1)
-                            if max_order_dict["order__max"] is not None
-                            else 0
-                        )
 
-                        assignment = PlayerType.objects.create(
-                            player=player, type_name=type_name, order=new_order
-                        )
-                        return JsonResponse(
-                            {
-                                "status": "success",
-                                "assignment_id": assignment.id,
-                                "message": "Typ zugewiesen.",
-                                "removed_from_player_id": old_player_id,
-                            }
+                    # The raw upsert sends no signals, so notify both players here.
+                    transaction.on_commit(legality.invalidate)
+                    for changed_player_id in {player.id, old_player_id} - {None}:
+                        transaction.on_commit(
+                            lambda changed_player_id=changed_player_id: events.publish_player_types(
+                                changed_player_id
+                            )
                         )
-                else:
-                    max_order_dict = PlayerType.objects.filter(player=player).aggregate(
-                        Max("order")
-                    )
-                    new_order = (
-                        (max_order_dict["order__max"] + 1)
-                        if max_order_dict["order__max"] is not None
-                        else 0
-                    )
 
-                    assignment = PlayerType.objects.create(
-                        player=player, type_name=type_name, order=new_order
-                    )
-                    return JsonResponse(
-                        {
-                            "status": "success",
-                            "assignment_id": assignment.id,
-                            "message": "Typ zugewiesen.",
-                        }
-                    )
+                response_data = {
+                    "status": "success",
+                    "assignment_id": assignment_id,
+                    "message": "Typ zugewiesen.",
+                }
+                if old_player_id is not None:
+                    response_data["removed_from_player_id"] = old_player_id
+                return JsonResponse(response_data)
 
             except Exception as e:
                 return JsonResponse({"status": "error", "message": str(e)}, status=500)
@@ -1105,6 +888,49 @@ def player_types_view(request):
             except Exception as e:
                 return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
+        elif action == "distribute_all":
+            try:
+                player_ids = [int(pid) for pid in request.POST.getlist("player_ids")]
+                seed = request.POST.get("seed")
+                seed = int(seed) if seed else None
+                quotas = {
+                    int(pid): int(quota)
+                    for pid, quota in json.loads(request.POST.get("quotas") or "{}").items()
+                }
+            except (ValueError, TypeError, AttributeError, json.JSONDecodeError):
+                return JsonResponse(
+                    {"status": "error", "message": "Ungültige Spieler, Quoten oder Seed."},
+                    status=400,
+                )
+
+            try:
+                assignments = distribute_types(player_ids or None, quotas, seed)
+            except IntegrityError:
+                return JsonResponse(
+                    {
+                        "status": "error",
+                        "message": "Typen wurden gleichzeitig vergeben. Bitte erneut versuchen.",
+                    },
+                    status=409,
+                )
+            except Exception as e:
+                return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+            return JsonResponse(
+                {
+                    "status": "success",
+                    "message": f"{len(assignments)} Typen verteilt.",
+                    "assignments": [
+                        {
+                            "assignment_id": assignment.id,
+                            "player_id": assignment.player_id,
+                            "type_name": assignment.type_name,
+                        }
+                        for assignment in assignments
+                    ],
+                }
+            )
+
         elif action == "reset_all_types":
             try:
                 deleted_count, _ = PlayerType.objects.all().delete()
@@ -1123,18 +949,12 @@ def player_types_view(request):
             )
 
     players = Player.objects.all()
-    player_types = PlayerType.objects.select_related("player").order_by(
-        "player__name", "order"
+    player_types = list(
+        PlayerType.objects.select_related("player").order_by("player__name", "order")
     )
-    german_type_map = get_german_type_names()
+    all_type_colors_de = get_type_registry().colors_de
 
-    all_type_colors_de = {}
-    if german_type_map:
-        for en_name, de_name in german_type_map.items():
-            color = TYPE_COLORS_EN.get(en_name, "#68A090")
-            all_type_colors_de[de_name] = color
-
-    assigned_types = set(PlayerType.objects.values_list("type_name", flat=True))
+    assigned_types = {player_type.type_name for player_type in player_types}
     available_type_colors_de = {
         type_name: color
         for type_name, color in all_type_colors_de.items()
@@ -1162,27 +982,49 @@ def rules_view(request):
 
 def pokemon_autocomplete(request):
     term = request.GET.get("term", "").strip()
+    player_id = parse_id(request.GET.get("player"))
+    route_id = parse_id(request.GET.get("route"))
+    if player_id:
+        allowed = legality.allowed_mask(player_id)
+        dupes = legality.caught_families(player_id, route_id)
+    else:
+        allowed, dupes = 0, frozenset()
     if len(term) < 2:
-        return JsonResponse([], safe=False)
-
-    pokemons = PokemonSpecies.objects.filter(name__icontains=term).values_list(
-        "name", flat=True
-    )[:10]
+        names = []
+    else:
+        names = [
+            name
+            for _, name in search_species(
+                term, allowed_mask=allowed, exclude_families=dupes, route_id=route_id
+            )
+        ]
 
-    return JsonResponse(list(pokemons), safe=False)
+    response = JsonResponse(names, safe=False)
+    if player_id:
+        # The result depends on the player's types and catches, which can change any time.
+        patch_cache_control(response, no_cache=True)
+    else:
+        patch_cache_control(response, max_age=AUTOCOMPLETE_MAX_AGE)
+    return response
 
 
 def type_wheel_view(request):
-    players = Player.objects.all()
-    german_type_map = get_german_type_names()
-
-    all_type_colors_de = {}
-    if german_type_map:
-        for en_name, de_name in german_type_map.items():
-            color = TYPE_COLORS_EN.get(en_name, "#68A090")
-            all_type_colors_de[de_name] = color
+    players = list(
+        Player.objects.annotate(type_count=Count("assigned_types")).order_by("name")
+    )
+    all_type_colors_de = get_type_registry().colors_de
+
+    types_by_player = {player.id: [] for player in players}
+    assigned_types = set()
+    for player_id, type_name in PlayerType.objects.order_by("order").values_list(
+        "player_id", "type_name"
+    ):
+        assigned_types.add(type_name)
+        if player_id in types_by_player:
+            types_by_player[player_id].append(type_name)
+    for player in players:
+        player.types = types_by_player[player.id]
 
-    assigned_types = set(PlayerType.objects.values_list("type_name", flat=True))
     available_types = [
         type_name
         for type_name in all_type_colors_de.keys()
@@ -1194,22 +1036,25 @@ def type_wheel_view(request):
 
     available_types.sort()
 
-    for player in players:
-        player.type_count = PlayerType.objects.filter(player=player).count()
-
-    player_types = PlayerType.objects.select_related("player").order_by(
-        "player__name", "order"
-    )
-
-    import json
-
     context = {
         "players": players,
-        "player_types": player_types,
         "available_types": json.dumps(available_types),
         "type_colors": json.dumps(available_type_colors),
         "all_type_colors_de": all_type_colors_de,
         "active_tab": "rad",
     }
     return render(request, "tracker/type_wheel.html", context)
-    return render(request, "tracker/type_wheel.html", context)
+
+
+async def event_stream(request):
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the stream would pin a worker thread forever; 204 tells
+        # EventSource to stop reconnecting.
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        events.stream(), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.template.loader import render_to_string
+
+from . import autocomplete, typechart
+from .grid import build_tracker_grid
+from .models import Encounter, PokemonSpecies, Route
+from .type_registry import get_type_registry, store_german_names
+
+
+def warm_type_names():
+    return len(store_german_names())
+
+
+def warm_type_registry():
+    return len(get_type_registry().en_to_de)
+
+
+def warm_effectiveness():
+    pairs = PokemonSpecies.objects.order_by().values_list("type1", "type2").distinct()
+    groups = typechart.grouped_effectiveness_batch(pairs)
+    return len(groups) if groups is not None else 0
+
+
+def warm_autocomplete():
+    autocomplete.get_route_species()
+    return len(autocomplete.get_index().species)
+
+
+def warm_route_rows():
+    # Rendering the tracker once fills every cached route row fragment; the
+    # rows do not depend on the request.
+    type_colors_de = get_type_registry().colors_de
+    render_to_string(
+        "tracker/tracker.html",
+        {
+            "grid": build_tracker_grid(type_colors_de),
+            "all_type_colors_de": dict(type_colors_de),
+            "status_choices": Encounter.STATUS_CHOICES,
+        },
+    )
+    return Route.objects.count()
+
+
+# Stored in the shared cache, so any process can warm them for all the others;
+# manage.py warm_caches runs these.
+SHARED_WARMERS = {
+    "type_names": warm_type_names,
+    "route_rows": warm_route_rows,
+}
+# Built in each server process's memory from the shared data above. Only the
+# server can warm them, on startup with WARM_CACHES_ON_STARTUP.
+LOCAL_WARMERS = {
+    "type_registry": warm_type_registry,
+    "effectiveness": warm_effectiveness,
+    "autocomplete": warm_autocomplete,
+}
+WARMERS = {**SHARED_WARMERS, **LOCAL_WARMERS}
+
+
+def run_warmer(name):
+    started = time.perf_counter()
+    try:
+        return name, WARMERS[name](), time.perf_counter() - started
+    finally:
+        connections.close_all()
+
+
+def warm_caches(names=None, workers=4):
+    names = list(names or WARMERS)
+    # The other local warmers need the registry, so load it first.
+    if "type_registry" in names:
+        names.remove("type_registry")
+        results = [run_warmer("type_registry")]
+    else:
+        results = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results.extend(executor.map(run_warmer, names))
+    return results
+
+
+def warm_caches_in_background(workers=4):
+    def run():
+        try:
+            for name, count, seconds in warm_caches(workers=workers):
+                print(f"Warmed {name}: {count} entries in {seconds * 1000:.0f} ms")
+        except Exception as e:
+            print(f"Error warming caches: {e}")
+
+    thread = threading.Thread(target=run, name="warm-caches", daemon=True)
+    thread.start()
+    return thread